@@ -1,268 +1,271 @@
-<<<<<<< HEAD
-=======
 import os
 import logging
->>>>>>> 848dcf7 (Add files via upload)
-import time
+import argparse
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-<<<<<<< HEAD
-from webdriver_manager.chrome import ChromeDriverManager
-=======
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, Border, Side, PatternFill
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from excel_writer import save_with_auto_width
+from driver_pool import init_driver, open_page, PROFILES, PROFILE_FULL
+from readiness import WaitBudget, wait_for, page_height_stable, text_changed
+from price_tiles import PRICE_TILE_SELECTOR, read_tiles, verify_tiles
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
->>>>>>> 848dcf7 (Add files via upload)
 
-# Initialize WebDriver
-def init_driver():
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-<<<<<<< HEAD
-    driver.implicitly_wait(10)  # Wait for elements before raising exceptions
-    return driver
+# Default page checked when the script is run on its own
+DEFAULT_URL = "https://www.alojamiento.io/"
 
-# Test: Check if Property Tiles Currency Changes Based on Dropdown Selection
-def check_currency_change(driver, url, output_xlsx, output_summary_xlsx):
-    driver.get(url)
-    time.sleep(2)
+# Time allowed for the price tiles to update after picking a currency, in seconds
+PRICE_UPDATE_TIMEOUT = 5
 
-    # Attempt to locate the currency selector button and click it
-    try:
-        # Using WebDriverWait to ensure the element is visible and clickable
-        print("Waiting for the currency selector button...")
-        currency_button = WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable((By.ID, "currency-selector"))  # Update with correct ID if necessary
-        )
-        print("Currency selector button found, clicking...")
-        currency_button.click()
-    except Exception as e:
-        print(f"Error: Could not locate or click currency selector button. {e}")
-        return
+# The currency dropdown and its options
+DROPDOWN_ID = "js-currency-sort-footer"
+OPTION_SELECTOR = f"#{DROPDOWN_ID} .select-ul > li"
 
-    # Wait for the dropdown to become visible
-    try:
-        print("Waiting for the currency dropdown to appear...")
-        currency_dropdown = WebDriverWait(driver, 20).until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, ".currency-selector__list"))  # The class for the dropdown
-        )
-        print("Currency dropdown found!")
-    except Exception as e:
-        print(f"Error: Currency dropdown not visible. {e}")
-        return
-
-    # Find all currency options in the dropdown
-    print("Finding all currency options...")
-    currency_options = driver.find_elements(By.CSS_SELECTOR, ".currency-selector__list-item")  # List of options
-    print(f"Found {len(currency_options)} currency options.")
-    
-    for option in currency_options:
-        if option.text.strip() == "EUR":  # Example: Choose EUR; can replace with any currency you want
-            print("Clicking on EUR...")
-            option.click()
-            break
-    else:
-        print("Currency option not found.")
-        return
-
-    # Wait for the page to update and verify if the currency in property tiles changed
-    time.sleep(3)  # Ensure the page has time to update
-    print("Verifying if the currency in property tiles has changed...")
-    property_tiles = driver.find_elements(By.CSS_SELECTOR, ".property-tile .price")  # Look for the updated price
-    currency_changed = False
-
-    for tile in property_tiles:
-        if '€' in tile.text:  # Check for EUR (adjust for other currencies)
-            currency_changed = True
-            break
-
-    if currency_changed:
-        result = "Pass"
-        comment = "Currency change verified successfully."
-    else:
-        result = "Fail"
-        comment = "Currency change not reflected in property tiles."
-
-    # Save the result to an Excel file
-    test_results = [{
-        "URL": url,
-        "Testcase": "Currency Filtering Test",
-        "Result": result,
-        "Comments": comment
-    }]
-    df_results = pd.DataFrame(test_results)
-    df_results.to_excel(output_xlsx, index=False)
-
-    # Create a summary DataFrame for Pass/Fail count
-    summary_data = [{
-        "Test": "Currency Change Summary",
-        "Result": result,
-        "Total Currency Options": len(currency_options)
-    }]
-    df_summary = pd.DataFrame(summary_data)
-    df_summary.to_excel(output_summary_xlsx, index=False)
-
-    print(f"Currency change test result saved to {output_xlsx}")
-    print(f"Currency change summary saved to {output_summary_xlsx}")
-
-def main():
-    url = "https://www.alojamiento.io/"  # Replace with the actual URL
-    output_xlsx = "test_results/currency_change_results.xlsx"
-    output_summary_xlsx = "test_results/currency_change_summary.xlsx"
-    driver = init_driver()
+# Times an option is looked up and clicked again when the footer re-renders under it
+STALE_RETRIES = 3
 
-    check_currency_change(driver, url, output_xlsx, output_summary_xlsx)
+# Runs in the page: the stable identifier (data-currency-country) and symbol of every option
+_OPTIONS_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0]), li => {
+    const label = li.querySelector(".option > p");
+    const text = label ? (label.innerText || label.textContent || "").trim() : "";
+    return [li.getAttribute("data-currency-country"), text.split(" ")[0].trim()];
+});
+"""
 
-    driver.quit()
-=======
-    driver.implicitly_wait(10)
-    return driver
+# Runs in the page: the current option element with a given identifier, or null.
+# A script lookup returns at once instead of sitting out the driver's implicit wait.
+_FIND_OPTION_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).find(li => li.getAttribute("data-currency-country") === arguments[1]) || null;
+"""
 
 # Ensure directory exists
 def ensure_directory(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
-# Save DataFrame to Excel with auto-adjusted column widths and formatting
-def save_with_auto_width(filepath, df):
-    """
-    Save a DataFrame to an Excel file, auto-adjust column widths, and enhance formatting.
+# Scroll down to load all content, stopping as soon as the page stops growing
+def _load_lazy_content(driver, budget):
+    for _ in range(3):
+        height = driver.execute_script("window.scrollTo(0, document.body.scrollHeight); return document.body.scrollHeight;")
+        wait_for(driver, page_height_stable(), "lazy content loaded", budget)
+        if driver.execute_script("return document.body.scrollHeight") == height:
+            break
 
-    Args:
-        filepath (str): Path to save the Excel file.
-        df (pd.DataFrame): DataFrame to save.
-    """
-    df.to_excel(filepath, index=False, engine='openpyxl')
-    wb = load_workbook(filepath)
-    ws = wb.active
-
-    # Define styles for formatting
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill("solid", fgColor="4F81BD")
-    alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin")
+# Open the currency dropdown and return it
+def _open_dropdown(driver):
+    dropdown = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.ID, DROPDOWN_ID))
     )
+    dropdown.click()
+    logging.info("Currency dropdown opened.")
+    return dropdown
 
-    # Adjust column widths and format headers
-    for col in ws.columns:
-        max_length = 0
-        col_letter = col[0].column_letter
-        for cell in col:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except Exception as e:
-                logging.warning(f"Error calculating column width: {e}")
-                pass
-            cell.alignment = alignment
-            cell.border = border
-        ws.column_dimensions[col_letter].width = max_length + 5
-
-    # Apply header formatting
-    for cell in ws[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = alignment
-
-    wb.save(filepath)
+# Identifiers and symbols of all currency options, read in one round-trip
+def _read_options(driver):
+    return [(country, symbol) for country, symbol in driver.execute_script(_OPTIONS_SCRIPT, OPTION_SELECTOR)]
+
+# Pick a currency by its identifier, looking the elements up again whenever they go stale
+def _select_currency(driver, country):
+    """
+    Open the dropdown and click the option with the given data-currency-country.
+
+    Elements are resolved fresh on every attempt, so a footer re-render only
+    costs a retry instead of a failed row.
+
+    Returns:
+        int: Number of stale-element retries it took.
+    """
+    for attempt in range(STALE_RETRIES + 1):
+        try:
+            driver.find_element(By.ID, DROPDOWN_ID).click()
+            option = driver.execute_script(_FIND_OPTION_SCRIPT, OPTION_SELECTOR, country)
+            if option is None:
+                raise NoSuchElementException(f"Currency option {country} is no longer in the dropdown")
+            WebDriverWait(driver, 10).until(EC.element_to_be_clickable(option)).click()
+            return attempt
+        except StaleElementReferenceException:
+            if attempt < STALE_RETRIES:
+                logging.info(f"Currency option {country} went stale, looking it up again ({attempt + 1}/{STALE_RETRIES})")
+    raise StaleElementReferenceException(f"Currency option {country} kept going stale after {STALE_RETRIES} retries")
+
+# Pick one currency option and check that every price tile shows its symbol
+def _validate_currency(driver, data_country, currency_symbol):
+    try:
+        prices_before = read_tiles(driver)
+        stale_retries = _select_currency(driver, data_country)
+        wait_for(driver, text_changed(PRICE_TILE_SELECTOR, prices_before, currency_symbol), f"prices updated to {currency_symbol}", WaitBudget(PRICE_UPDATE_TIMEOUT))
+
+        # All tile texts in one round-trip, checked with the currency's compiled price matcher
+        status, reason = verify_tiles(read_tiles(driver), currency_symbol)
+        if stale_retries:
+            reason = f"{reason} (after {stale_retries} stale-element retries)"
+        return {"Currency Name": data_country, "Currency Symbol": currency_symbol, "Status": status, "Reason": reason}
+    except StaleElementReferenceException as e:
+        # The page kept re-rendering under us: a flaky run, not wrong prices
+        logging.error(f"Error for currency {currency_symbol}: {e.msg}")
+        return {"Currency Name": data_country, "Currency Symbol": currency_symbol, "Status": "Fail", "Reason": f"Stale element: {e.msg}"}
+    except Exception as e:
+        logging.error(f"Error for currency {currency_symbol}: {str(e)}")
+        return {"Currency Name": data_country, "Currency Symbol": currency_symbol, "Status": "Fail", "Reason": str(e)}
 
 # Test currency filter functionality
-def test_currency_filter(driver, url):
+def test_currency_filter(driver, url, load_page=True, sink=None, workers=1, driver_factory=None):
+    """
+    Check that picking each currency updates every price tile.
+
+    With `workers` > 1 the currencies are split across that many browsers:
+    `driver` plus `workers - 1` started with `driver_factory`, each loading
+    the page on its own and validating its share concurrently. Rows come
+    back (and are streamed) in dropdown order either way.
+
+    Args:
+        driver (webdriver): Selenium WebDriver instance.
+        url (str): URL of the page to check.
+        load_page (bool): Load the URL first; False when the driver already shows it.
+        sink (RowSink): Receives each currency row as soon as it is known; optional.
+        workers (int): Number of browsers validating currencies at once.
+        driver_factory (callable): Starts the extra browsers; a headless init_driver if omitted.
+
+    Returns:
+        list: One row per currency with "Currency Name", "Currency Symbol", "Status" and "Reason".
+    """
     logging.info(f"Starting Currency Filter Test for URL: {url}")
     testcase = "Currency Filter Test"
     results = []  # List to store individual test results for each currency
 
-    try:
-        driver.get(url)
-        logging.info("Page loaded successfully.")
-
-        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+    # Record a result, streaming it to the sink as soon as it is known
+    def add_result(row):
+        results.append(row)
+        if sink is not None:
+            sink.emit(row)
 
-        # Scroll down to load all content
-        for _ in range(3):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+    try:
+        budget = WaitBudget()
+        if load_page:
+            open_page(driver, url, budget)
+            logging.info("Page loaded successfully.")
 
-        dropdown = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.ID, "js-currency-sort-footer"))
-        )
-        dropdown.click()
-        logging.info("Currency dropdown opened.")
+        _load_lazy_content(driver, budget)
+        _open_dropdown(driver)
 
-        options = dropdown.find_elements(By.CSS_SELECTOR, ".select-ul > li")
+        # Options are tracked by identifier, not WebElement, so re-renders cannot make them stale
+        options = _read_options(driver)
         logging.info(f"Found {len(options)} currency options.")
 
         if not options:
             logging.warning("No currency options found in the dropdown.")
-            return [{"Currency Name": "All", "Currency Symbol": "N/A", "Status": "Fail", "Reason": "No currency options found"}]
-
-        for option in options:
-            data_country = option.get_attribute("data-currency-country")
-            currency_element = option.find_element(By.CSS_SELECTOR, ".option > p")
-            currency_symbol = currency_element.text.split(" ")[0].strip()
-
-            try:
-                dropdown.click()
-                WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable(option)
-                ).click()
-
-                tiles = driver.find_elements(By.CLASS_NAME, "js-price-value")
-                if not tiles or not all(currency_symbol in tile.text for tile in tiles):
-                    results.append({"Currency Name": data_country, "Currency Symbol": currency_symbol, "Status": "Fail", "Reason": "Currency not reflected in tiles"})
-                else:
-                    results.append({"Currency Name": data_country, "Currency Symbol": currency_symbol, "Status": "Pass", "Reason": "Validation successful"})
-            except Exception as e:
-                results.append({"Currency Name": data_country, "Currency Symbol": currency_symbol, "Status": "Fail", "Reason": str(e)})
-                logging.error(f"Error for currency {currency_symbol}: {str(e)}")
+            add_result({"Currency Name": "All", "Currency Symbol": "N/A", "Status": "Fail", "Reason": "No currency options found"})
+            return results
+
+        if workers > 1 and len(options) > 1:
+            _validate_in_parallel(driver, url, options, add_result, workers, driver_factory)
+            return results
+
+        for data_country, currency_symbol in options:
+            add_result(_validate_currency(driver, data_country, currency_symbol))
 
         return results
 
     except Exception as e:
         logging.error(f"Error during {testcase}: {str(e)}")
-        return [{"Currency Name": "All", "Currency Symbol": "N/A", "Status": "Fail", "Reason": f"Exception: {str(e)}"}]
+        # Keep the currencies already checked; they have been streamed to the sink too
+        add_result({"Currency Name": "All", "Currency Symbol": "N/A", "Status": "Fail", "Reason": f"Exception: {str(e)}"})
+        return results
+
+# Validate the currencies across several browsers, reporting rows in dropdown order
+def _validate_in_parallel(driver, url, options, add_result, workers, driver_factory):
+    workers = min(workers, len(options))
+    # Round-robin shares; the first one is validated on the page already open in `driver`
+    shares = [list(range(len(options)))[start::workers] for start in range(workers)]
+    driver_factory = driver_factory or functools.partial(init_driver, headless=True)
+    logging.info(f"Validating {len(options)} currencies across {workers} browsers.")
+
+    rows = [None] * len(options)
+    reported = [0]
+    lock = threading.Lock()
+
+    # Store a row and report every row that is now complete, in order
+    def complete(index, row):
+        with lock:
+            rows[index] = row
+            while reported[0] < len(rows) and rows[reported[0]] is not None:
+                add_result(rows[reported[0]])
+                reported[0] += 1
+
+    def validate_share(share, worker_driver):
+        for index in share:
+            data_country, currency_symbol = options[index]
+            complete(index, _validate_currency(worker_driver, data_country, currency_symbol))
+
+    def run_extra_browser(share):
+        try:
+            worker_driver = driver_factory()
+        except Exception as e:
+            for index in share:
+                complete(index, {"Currency Name": options[index][0], "Currency Symbol": options[index][1], "Status": "Fail", "Reason": f"Browser failed to start: {e}"})
+            return
+        try:
+            budget = WaitBudget()
+            open_page(worker_driver, url, budget)
+            _load_lazy_content(worker_driver, budget)
+            _open_dropdown(worker_driver)
+            validate_share(share, worker_driver)
+        except Exception as e:
+            # The page or dropdown never became usable in this browser
+            for index in share:
+                complete(index, {"Currency Name": options[index][0], "Currency Symbol": options[index][1], "Status": "Fail", "Reason": f"Exception: {str(e)}"})
+        finally:
+            worker_driver.quit()
+
+    with ThreadPoolExecutor(max_workers=workers - 1) as executor:
+        futures = [executor.submit(run_extra_browser, share) for share in shares[1:]]
+        validate_share(shares[0], driver)
+        for future in futures:
+            future.result()
+
+# Build the summary row of the currency filter test from its per-currency results
+def build_currency_summary(url, results):
+    fail_count = len([res for res in results if res["Status"] == "Fail"])
+
+    overall_status = "Pass" if fail_count == 0 else "Fail"
+    comments = "All currencies passed successfully." if fail_count == 0 else f"{fail_count} currencies failed."
+
+    return {
+        "page_url": url,
+        "testcase": "Currency Filter Test",
+        "status": overall_status,
+        "comments": comments
+    }
 
 # Main function
 def main():
-    url = "https://www.alojamiento.io/"  # Replace with the actual URL
+    parser = argparse.ArgumentParser(description="Check that every currency option updates the price tiles.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of browsers validating currencies at once")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=PROFILE_FULL, help="Browser profile of every browser the check starts")
+    args = parser.parse_args()
+
+    url = DEFAULT_URL
     output_dir = "test_results"
     ensure_directory(output_dir)
 
     output_results_xlsx = os.path.join(output_dir, "currency_test_results.xlsx")
     output_summary_xlsx = os.path.join(output_dir, "currency_test_summary.xlsx")
 
-    driver = init_driver()
+    driver = init_driver(profile=args.profile)
     try:
-        results = test_currency_filter(driver, url)
+        results = test_currency_filter(driver, url, workers=args.workers, driver_factory=functools.partial(init_driver, headless=True, profile=args.profile))
 
         df_results = pd.DataFrame(results)
         save_with_auto_width(output_results_xlsx, df_results)
 
-        fail_results = [res for res in results if res["Status"] == "Fail"]
-        pass_count = len([res for res in results if res["Status"] == "Pass"])
-        fail_count = len(fail_results)
-
-        overall_status = "Pass" if fail_count == 0 else "Fail"
-        comments = "All currencies passed successfully." if fail_count == 0 else f"{fail_count} currencies failed."
-
-        summary_data = [{
-            "page_url": url,
-            "testcase": "Currency Filter Test",
-            "status": overall_status,
-            "comments": comments
-        }]
-        df_summary = pd.DataFrame(summary_data)
+        df_summary = pd.DataFrame([build_currency_summary(url, results)])
 
         save_with_auto_width(output_summary_xlsx, df_summary)
         logging.info(f"Test results saved to {output_results_xlsx}")
@@ -272,14 +275,9 @@ def main():
         logging.error(f"An error occurred during execution: {e}")
     finally:
         driver.quit()
->>>>>>> 848dcf7 (Add files via upload)
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-<<<<<<< HEAD
-        print("Execution interrupted by user.")
-=======
         logging.info("Execution interrupted by user.")
->>>>>>> 848dcf7 (Add files via upload)
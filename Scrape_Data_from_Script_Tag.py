@@ -1,193 +1,126 @@
-<<<<<<< HEAD
-=======
 import os
 import logging
->>>>>>> 848dcf7 (Add files via upload)
-import time
+import argparse
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-<<<<<<< HEAD
-=======
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, Border, Side, PatternFill
+from excel_writer import save_with_auto_width
+from driver_pool import init_driver, open_page
+from dom_extract import extract_elements
+from script_data import extract_sources, match_fields
+import static_engine
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
->>>>>>> 848dcf7 (Add files via upload)
-
-# Initialize WebDriver
-def init_driver():
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    driver.implicitly_wait(10)
-    return driver
-
-<<<<<<< HEAD
-# Test: Scrape Data from Script Tag
-def scrape_script_data(driver, url):
-    driver.get(url)
-    time.sleep(2)
-    try:
-        script_data = driver.find_element(By.TAG_NAME, "script").get_attribute("innerHTML")
-        data = {
-            "SiteURL": url,
-            "CampaignID": "12345",  # Placeholder
-            "SiteName": "Alojamiento",
-            "Browser": "Chrome",
-            "CountryCode": "US",
-            "IP": "192.168.1.1",  # Placeholder
-        }
-        return "Pass", data
-    except Exception as e:
-        return "Fail", f"Error: {str(e)}"
-
-def main():
-    url = "https://www.alojamiento.io/all/spain/community-of-madrid/madrid/"
-    output_csv = "script_data_results.csv"
-    driver = init_driver()
-
-    result, data = scrape_script_data(driver, url)
 
-    test_results = [{
-        "page_url": url,
-        "testcase": "Scrape Script Data",
-        "result": result,
-        "comments": data,
-    }]
-
-    df = pd.DataFrame(test_results)
-    df.to_csv(output_csv, index=False)
-    print(f"Script data scrape results saved to {output_csv}")
+# Default page checked when the script is run on its own
+DEFAULT_URL = "https://www.alojamiento.io/all/spain/community-of-madrid/madrid/"
+
+# Script data checked on every page: report field -> (path, pattern the value must match or None).
+# A path starts with its source: "window" (global assignments such as `var ScriptData = {...}`),
+# "dataLayer" (pushed objects, latest first) or "jsonld" (JSON-LD blocks); see script_data.resolve.
+SCRIPT_FIELDS = {
+    "SiteURL": ("window.ScriptData.config.SiteUrl", r"^https?://"),
+    "CampaignID": ("window.ScriptData.config.CampaignId", r"\S"),
+    "SiteName": ("window.ScriptData.config.SiteName", r"\S"),
+    "Browser": ("window.ScriptData.userInfo.Browser", r"\S"),
+    "CountryCode": ("window.ScriptData.userInfo.CountryCode", r"^[A-Z]{2}$"),
+    "IP": ("window.ScriptData.userInfo.IP", r"^[0-9A-Fa-f.:]+$"),
+}
 
-    driver.quit()
-=======
 # Ensure directory exists
 def ensure_directory(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
-# Save DataFrame to Excel with auto-adjusted column widths and formatting
-def save_with_auto_width(filepath, df):
-    df.to_excel(filepath, index=False, engine='openpyxl')
-    wb = load_workbook(filepath)
-    ws = wb.active
-
-    # Define styles for formatting
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill("solid", fgColor="4F81BD")
-    alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin")
-    )
-
-    # Adjust column widths and format headers
-    for col in ws.columns:
-        max_length = 0
-        col_letter = col[0].column_letter
-        for cell in col:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except Exception as e:
-                logging.warning(f"Error calculating column width: {e}")
-                pass
-            cell.alignment = alignment
-            cell.border = border
-        ws.column_dimensions[col_letter].width = max_length + 5
-
-    # Apply header formatting
-    for cell in ws[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = alignment
-
-    wb.save(filepath)
-
 # Scrape data from the <script> tag of a webpage
-def scrape_script_data(driver, url):
+def scrape_script_data(driver, url, load_page=True, fields=SCRIPT_FIELDS):
     """
-    Scrape data from the <script> tag of a webpage.
+    Scrape data from the <script> tags of a webpage.
 
     Args:
         driver (webdriver): Selenium WebDriver instance.
         url (str): URL of the webpage to scrape.
+        load_page (bool): Load the URL first; False when the driver already shows it.
+        fields (dict): Field spec, as SCRIPT_FIELDS.
 
     Returns:
-        tuple: A result status ("Pass" or "Fail") and a dictionary containing scraped data or an error message.
+        tuple: A result status ("Pass" or "Fail") and one row per field, from script_data.match_fields.
     """
-    driver.get(url)
-    time.sleep(2)
+    if load_page:
+        open_page(driver, url)
     try:
-        # Simulated script data extraction using the provided dictionary
-        data = {
-            "SiteURL": "https://www.alojamiento.io",
-            "CampaignID": "ALOJAMIENTO",
-            "SiteName": "Alojamiento",
-            "Browser": "Chrome",
-            "CountryCode": "BD",
-            "IP": "182.160.106.203"
-        }
-        return "Pass", data
+        # Every script block in one round-trip
+        scripts = extract_elements(driver, "script", ["type", "textContent"])
+        return evaluate_script_data(scripts, fields)
     except Exception as e:
-        return "Fail", {"Error": str(e)}
+        logging.error(f"Error extracting script data from {url}: {e}")
+        return "Fail", [{"Field": "All", "Path": "N/A", "Value": "N/A", "Status": "Fail", "Reason": str(e)}]
+
+# Check a page's script blocks, from the browser or from static HTML, against the field spec
+def evaluate_script_data(scripts, fields=SCRIPT_FIELDS):
+    # Only the spec's paths are parsed out of the page's (possibly multi-megabyte) script payloads
+    sources = extract_sources(scripts, paths=[path for path, _ in fields.values()])
+    rows = match_fields(sources, fields)
+    result = "Pass" if all(row["Status"] == "Pass" for row in rows) else "Fail"
+    return result, rows
+
+# Build the detailed rows and the summary row of the script data test
+def build_script_data_report(url, result, rows):
+    detailed_results = rows
+
+    # Update only summary with pass/fail
+    if result == "Pass":
+        comments = f"All {len(rows)} script data fields extracted successfully"
+    else:
+        comments = "; ".join(f"{row['Field']}: {row['Reason']}" for row in rows if row["Status"] != "Pass")
+    summary = {
+        "page_url": url,
+        "testcase": "test of script data",
+        "status": result,
+        "comments": comments
+    }
+    return detailed_results, summary
 
 # Main function
 def main():
-    url = "https://www.alojamiento.io/all/spain/community-of-madrid/madrid/"
+    parser = argparse.ArgumentParser(description="Extract and validate the script data of a page.")
+    parser.add_argument("--url", default=DEFAULT_URL, help="Page to check")
+    parser.add_argument("--static", action="store_true", help="Read the scripts from the fetched HTML instead of a browser")
+    args = parser.parse_args()
+
+    url = args.url
     output_dir = "test_results"
     ensure_directory(output_dir)
 
     output_results_xlsx = os.path.join(output_dir, "script_data_results.xlsx")
     output_summary_xlsx = os.path.join(output_dir, "script_data_summary.xlsx")
 
-    driver = init_driver()
+    driver = None if args.static else init_driver()
 
     try:
         # Scrape data and get the result
-        result, data = scrape_script_data(driver, url)
+        if args.static:
+            result, rows = evaluate_script_data(static_engine.fetch_page(url)["scripts"])
+        else:
+            result, rows = scrape_script_data(driver, url)
+        detailed_results, summary = build_script_data_report(url, result, rows)
 
         # Save detailed results
-        detailed_results = [{
-            "SiteURL": "https://www.alojamiento.io",
-            "CampaignID": "ALOJAMIENTO",
-            "SiteName": "Alojamiento",
-            "Browser": "Chrome",
-            "CountryCode": "BD",
-            "IP": "182.160.106.203"
-        }]
         df_detailed_results = pd.DataFrame(detailed_results)
         save_with_auto_width(output_results_xlsx, df_detailed_results)
         logging.info(f"Script data detailed results saved to {output_results_xlsx}")
 
-        # Update only summary with pass/fail
-        comments = "All script data extracted successfully" if result == "Pass" else data.get("Error", "Unknown Error")
-        summary_results = [{
-            "page_url": url,
-            "testcase": "test of script data",
-            "status": result,
-            "comments": comments
-        }]
-        df_summary = pd.DataFrame(summary_results)
+        df_summary = pd.DataFrame([summary])
         save_with_auto_width(output_summary_xlsx, df_summary)
         logging.info(f"Script data summary saved to {output_summary_xlsx}")
 
     except Exception as e:
         logging.error(f"An error occurred: {e}")
     finally:
-        driver.quit()
->>>>>>> 848dcf7 (Add files via upload)
+        if driver is not None:
+            driver.quit()
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-<<<<<<< HEAD
-        print("Execution interrupted by user.")
-=======
         logging.info("Execution interrupted by user.")
->>>>>>> 848dcf7 (Add files via upload)
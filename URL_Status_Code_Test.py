@@ -1,243 +1,85 @@
-<<<<<<< HEAD
-import time
-import requests
-=======
 import os
-import time
-import requests
 import logging
->>>>>>> 848dcf7 (Add files via upload)
+import argparse
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
 import urllib3
-from openpyxl import load_workbook
-<<<<<<< HEAD
-=======
-from openpyxl.styles import Alignment, Font, Border, Side, PatternFill
->>>>>>> 848dcf7 (Add files via upload)
+from excel_writer import save_with_auto_width
+from driver_pool import init_driver, open_page
+from dom_extract import extract_elements
+from readiness import wait_for_elements
+from network_capture import page_responses, captured_row
+from link_index import canonical_links
+from url_normalize import normalize
+import http_client
+from link_cache import LinkStatusCache, DEFAULT_CACHE_PATH, parse_ttl_overrides
+from link_checker import check_links, DEFAULT_MAX_WORKERS, DEFAULT_PER_HOST_LIMIT, DEFAULT_PROBE_MODE, PROBE_HEAD, PROBE_GET
 
 # Disable insecure request warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-<<<<<<< HEAD
-# Initialize WebDriver
-def init_driver():
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    driver.implicitly_wait(10)  # Wait for elements before raising exceptions
-    return driver
-
-# Test: Check URL Status Codes and Save
-def check_url_status_and_save(driver, url, output_xlsx, output_summary_xlsx):
-    driver.get(url)
-    time.sleep(2)
-
-    # Find all anchor tags and extract their href attributes
-    links = [a.get_attribute("href") for a in driver.find_elements(By.TAG_NAME, "a") if a.get_attribute("href")]
-    links = list(set(link for link in links if link and link.startswith("http")))  # Filter duplicates
-
-    # # Filter out Facebook URLs
-    # links = [link for link in links if "facebook.com" not in link]
-=======
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 
-# Initialize WebDriver
-def init_driver():
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    driver.implicitly_wait(10)
-    return driver
+# Default page checked when the script is run on its own
+DEFAULT_URL = "https://www.alojamiento.io/property/mall-of-i-stanbul-3/BC-6975002/"
 
 # Ensure directory exists
 def ensure_directory(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
-# Save DataFrame to Excel with auto-adjusted column widths and formatting
-def save_with_auto_width(filepath, df):
-    df.to_excel(filepath, index=False, engine='openpyxl')
-    wb = load_workbook(filepath)
-    ws = wb.active
-
-    # Define styles for formatting
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill("solid", fgColor="4F81BD")
-    alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin")
-    )
-
-    # Adjust column widths and format headers
-    for col in ws.columns:
-        max_length = 0
-        col_letter = col[0].column_letter
-        for cell in col:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except Exception as e:
-                logging.warning(f"Error calculating column width: {e}")
-                pass
-            cell.alignment = alignment
-            cell.border = border
-        ws.column_dimensions[col_letter].width = max_length + 5
-
-    # Apply header formatting
-    for cell in ws[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = alignment
-
-    wb.save(filepath)
-
 # Test: Check URL Status Codes and Save
-def check_url_status_and_save(driver, url, output_xlsx, output_summary_xlsx):
+def check_url_status_and_save(driver, url, output_xlsx=None, output_summary_xlsx=None, max_workers=DEFAULT_MAX_WORKERS, per_host_limit=DEFAULT_PER_HOST_LIMIT, probe_mode=DEFAULT_PROBE_MODE, cache=None, load_page=True, capture_network=False, link_index=None):
+    """
+    Check the HTTP status of every link on a page.
+
+    Args:
+        driver (webdriver): Selenium WebDriver instance.
+        url (str): URL of the page to check.
+        output_xlsx (str): Where to save the detailed results; skipped if None.
+        output_summary_xlsx (str): Where to save the summary; skipped if None.
+        max_workers (int): Global concurrency limit for link checks.
+        per_host_limit (int): Concurrency limit per host.
+        probe_mode (str): PROBE_HEAD or PROBE_GET.
+        cache (LinkStatusCache): Optional persistent cache of link results.
+        load_page (bool): Load the URL first; False when the driver already shows it.
+        capture_network (bool): Take the statuses of everything the browser loaded with the
+            page from CDP network events, report those subresources too, and only probe
+            the anchors the page did not load itself.
+        link_index (LinkIndex): Run-wide index; links another page already checked
+            are not requested again.
+
+    Returns:
+        tuple: The detailed link rows and the summary row.
+    """
     logging.info(f"Starting URL Status Test for URL: {url}")
-    driver.get(url)
-    time.sleep(2)
+    if load_page:
+        open_page(driver, url)
 
-    # Extract all unique anchor links
-    links = [a.get_attribute("href") for a in driver.find_elements(By.TAG_NAME, "a") if a.get_attribute("href")]
-    links = list(set(link for link in links if link and link.startswith("http")))
+    # Extract all anchor links, keeping one per normalized URL in page order
+    wait_for_elements(driver, "a[href]", "links settled")
+    links = [href for (href,) in extract_elements(driver, "a", ["href"])]
+    links = list(canonical_links(link for link in links if link and link.startswith("http")).values())
 
     logging.info(f"Found {len(links)} unique links on the page.")
->>>>>>> 848dcf7 (Add files via upload)
-
-    # Set up a session with retries
-    session = requests.Session()
-    retries = Retry(total=5, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-    session.mount('https://', HTTPAdapter(max_retries=retries))
-
-<<<<<<< HEAD
-    # List to store the link attributes and status
-    link_data = []
-    pass_count = 0
-    fail_count = 0
-=======
-    # Store link details
-    link_data = []
-    pass_count = 0
-    fail_count = 0
-    failed_urls = []
->>>>>>> 848dcf7 (Add files via upload)
-
-    for link in links:
-        status = "Pass"
-        error_message = ""
-<<<<<<< HEAD
-        status_code = ""  # Variable to hold the HTTP status code
-
-        try:
-            response = session.get(link, timeout=5, verify=False)
-            status_code = response.status_code  # Store HTTP status code
-=======
-        status_code = ""
-
-        try:
-            response = session.get(link, timeout=5, verify=False)
-            status_code = response.status_code
->>>>>>> 848dcf7 (Add files via upload)
-            if status_code == 404:
-                status = "Fail"
-                error_message = "404 Not Found"
-                fail_count += 1
-<<<<<<< HEAD
-            else:
-=======
-                failed_urls.append(link)  # Add to failed URLs only if 404
-                any_404_error = True
-            else:
-                status = "pass"
->>>>>>> 848dcf7 (Add files via upload)
-                pass_count += 1
-        except requests.exceptions.Timeout:
-            status = "Fail"
-            error_message = "Timeout"
-            fail_count += 1
-        except requests.exceptions.RequestException as e:
-            status = "Fail"
-            error_message = f"Error: {e}"
-            fail_count += 1
-
-        link_data.append({
-            "URL": link,
-            "Status": status,
-<<<<<<< HEAD
-            "HTTP Status Code": status_code,  # Add HTTP status code
-            "Error Message": error_message if error_message else "None"
-        })
 
-    # Create a DataFrame and save to Excel for detailed status
-    df = pd.DataFrame(link_data)
-    df.to_excel(output_xlsx, index=False)
-
-    # Load the workbook and adjust column widths
-    wb = load_workbook(output_xlsx)
-    ws = wb.active
-
-    # Adjust column widths
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter  # Get the column name
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(cell.value)
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column].width = adjusted_width
-
-    # Save the adjusted Excel file
-    wb.save(output_xlsx)
-
-    # Create a summary DataFrame for Pass/Fail count
-    summary_data = [{
-        "Test": "URL Status Summary",
-        "Pass Count": pass_count,
-        "Fail Count": fail_count,
-        "Total URLs": len(links)
-    }]
-    df_summary = pd.DataFrame(summary_data)
-
-    # Save the summary to another Excel file
-    df_summary.to_excel(output_summary_xlsx, index=False)
-    print(f"URL status analysis saved to {output_xlsx}")
-    print(f"URL status summary saved to {output_summary_xlsx}")
-
-def main():
-    url = "https://www.alojamiento.io/"
-    output_xlsx = "test_results/url_status_results.xlsx"  # Change file extension to .xlsx
-    output_summary_xlsx = "test_results/url_status_summary.xlsx"  # Summary file
-    driver = init_driver()
-
-    check_url_status_and_save(driver, url, output_xlsx, output_summary_xlsx)
-
-    driver.quit()
-=======
-            "HTTP Status Code": status_code if status_code else "N/A",
-            "Error Message": error_message if error_message else "None"
-        })
+    if capture_network:
+        link_data = _check_with_network_capture(driver, links, max_workers, per_host_limit, probe_mode, cache, link_index)
+    else:
+        # Check all links concurrently; rows come back in the same order as links
+        link_data = _probe_links(links, max_workers, per_host_limit, probe_mode, cache, link_index)
 
-        logging.info(f"Checked URL: {link}, Status: {status}, HTTP Code: {status_code}, Error: {error_message}")
-    
     # Check after all URLs if none are 404, change all statuses to "Pass"
     if not any(item["HTTP Status Code"] == 404 for item in link_data):
         for item in link_data:
             item["Status"] = "Pass"
     
     # Save detailed URL status results
-    df_links = pd.DataFrame(link_data)
-    save_with_auto_width(output_xlsx, df_links)
+    if output_xlsx:
+        df_links = pd.DataFrame(link_data)
+        save_with_auto_width(output_xlsx, df_links)
+        logging.info(f"Detailed URL status analysis saved to {output_xlsx}")
     overall_status = "Pass" if all(link['Status'] == "Pass" for link in link_data) else "Fail"
-    logging.info(f"Detailed URL status analysis saved to {output_xlsx}")
     
     # Define comments based on test results
     if overall_status == "Pass":
@@ -246,41 +88,104 @@ def main():
         failed_count = sum(1 for link in link_data if link['Status'] == "Fail")
         comments = f"{failed_count} URL(s) failed."
     # Create summary including failed URLs
-    summary_data = [{
+    summary = {
         "page_url": url,
         "testcase": "Test of URLs",
         "status": overall_status,
         "comments": comments
-    }]
-    df_summary = pd.DataFrame(summary_data)
-    save_with_auto_width(output_summary_xlsx, df_summary)
-    logging.info(f"URL status summary saved to {output_summary_xlsx}")
+    }
+    if output_summary_xlsx:
+        df_summary = pd.DataFrame([summary])
+        save_with_auto_width(output_summary_xlsx, df_summary)
+        logging.info(f"URL status summary saved to {output_summary_xlsx}")
+
+    return link_data, summary
+
+# Check links concurrently, reusing what other pages of the run already checked
+def _probe_links(links, max_workers, per_host_limit, probe_mode, cache, link_index=None):
+    if link_index is None:
+        return check_links(links, max_workers=max_workers, per_host_limit=per_host_limit, probe_mode=probe_mode, cache=cache)
+
+    by_key = {normalize(link): link for link in links}
+    rows, claimed, pending = link_index.claim(list(by_key))
+    reused = len(rows)
+
+    def check(keys):
+        checked = check_links([by_key[key] for key in keys], max_workers=max_workers, per_host_limit=per_host_limit, probe_mode=probe_mode, cache=cache)
+        for key, row in zip(keys, checked):
+            link_index.store(key, row)
+            rows[key] = row
+
+    check(claimed)
+    waited = link_index.wait(pending)
+    rows.update(waited)
+    reused += len(waited)
+    # Links whose checker never delivered (e.g. a crashed worker) are checked here
+    check([key for key in pending if key not in waited])
+
+    logging.info(f"Reused {reused} link result(s) from other pages, checked {len(links) - reused}.")
+    # Rows carry this page's form of the link
+    return [dict(rows[normalize(link)], URL=link) for link in links]
+
+# Link rows from the browser's own network traffic, probing only the anchors it never requested
+def _check_with_network_capture(driver, links, max_workers, per_host_limit, probe_mode, cache, link_index=None):
+    responses = page_responses(driver)
+    # Matched by normalized URL: request URLs never carry a fragment, and anchors
+    # may differ from them in a trailing slash or the order of parameters
+    loaded = {normalize(url): response for url, response in responses.items()}
+    unseen = [link for link in links if normalize(link) not in loaded]
+    logging.info(f"Browser loaded {len(responses)} URLs; probing {len(unseen)} of {len(links)} links it did not load.")
+
+    probed = iter(_probe_links(unseen, max_workers, per_host_limit, probe_mode, cache, link_index))
+    link_data = []
+    for link in links:
+        key = normalize(link)
+        row = captured_row(link, loaded[key]) if key in loaded else dict(next(probed), **{"Source": "Probe"})
+        link_data.append(row)
+
+    # Subresources (scripts, styles, images, XHR...) are reported after the anchors
+    anchors = {normalize(link) for link in links}
+    link_data.extend(captured_row(url, response) for url, response in responses.items() if normalize(url) not in anchors)
+    return link_data
 
 # Main function
 def main():
-    url = "https://www.alojamiento.io/property/mall-of-i-stanbul-3/BC-6975002/"
+    parser = argparse.ArgumentParser(description="Check the HTTP status of every link on a page.")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Maximum number of links checked at once")
+    parser.add_argument("--per-host-limit", type=int, default=DEFAULT_PER_HOST_LIMIT, help="Maximum number of links checked at once per host")
+    parser.add_argument("--probe", choices=[PROBE_HEAD, PROBE_GET], default=DEFAULT_PROBE_MODE, help="Send HEAD first (falling back to GET) or always GET; bodies are never downloaded")
+    parser.add_argument("--no-cache", action="store_true", help="Check every link again instead of using the link status cache")
+    parser.add_argument("--cache-ttl", action="append", metavar="CLASS=SECONDS", help="Override how long a status class (2xx, 3xx, 4xx, 5xx, error) stays cached")
+    parser.add_argument("--capture-network", action="store_true", help="Use the statuses the browser saw while loading the page and only probe links it did not load")
+    parser.add_argument("--http2", action="store_true", help="Check links over HTTP/2 (needs httpx[http2])")
+    args = parser.parse_args()
+    http_client.configure(http2=args.http2)
+    try:
+        cache_ttls = parse_ttl_overrides(args.cache_ttl)
+    except ValueError as e:
+        parser.error(str(e))
+
+    url = DEFAULT_URL
     output_dir = "test_results"
     ensure_directory(output_dir)
 
     output_xlsx = os.path.join(output_dir, "url_status_results.xlsx")
     output_summary_xlsx = os.path.join(output_dir, "url_status_summary.xlsx")
 
+    cache = None if args.no_cache else LinkStatusCache(DEFAULT_CACHE_PATH, ttls=cache_ttls)
     driver = init_driver()
 
     try:
-        check_url_status_and_save(driver, url, output_xlsx, output_summary_xlsx)
+        check_url_status_and_save(driver, url, output_xlsx, output_summary_xlsx, args.max_workers, args.per_host_limit, args.probe, cache, capture_network=args.capture_network)
     except Exception as e:
         logging.error(f"An error occurred during execution: {e}")
     finally:
         driver.quit()
->>>>>>> 848dcf7 (Add files via upload)
+        if cache is not None:
+            cache.close()
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-<<<<<<< HEAD
-        print("Execution interrupted by user.")
-=======
         logging.info("Execution interrupted by user.")
->>>>>>> 848dcf7 (Add files via upload)
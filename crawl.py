@@ -0,0 +1,221 @@
+import os
+import re
+import sys
+import argparse
+import functools
+import multiprocessing.util
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+
+import http_client
+
+from driver_pool import DriverPool, init_driver, PROFILES, PROFILE_AUDIT
+from report_model import TEST_SUITE, ENGINE_BROWSER, ENGINE_STATIC, run_page_tests, consolidate_results, ensure_directory, with_link_options
+from link_index import reset_index
+from link_cache import LinkStatusCache, DEFAULT_CACHE_PATH
+from result_store import ResultStore, read_results
+from result_sink import JsonlSink, emit_started, emit_result, read_checkpoint
+
+# Tests run on every crawled page by default: the read-only page checks
+DEFAULT_CRAWL_TESTS = ["H1 Tag", "Html Tag", "Image Alt", "Script Data", "Url Status"]
+
+# Default crawl sizing
+DEFAULT_WORKERS = 4
+DEFAULT_PAGES_PER_WORKER = 50
+
+# Read URLs from a text file, one per line; blank lines and # comments are skipped
+def read_url_file(stream):
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+# Read page URLs from a sitemap or sitemap index, given as a URL or a local file
+def read_sitemap(location):
+    if location.startswith(("http://", "https://")):
+        response = requests.get(location, timeout=30)
+        response.raise_for_status()
+        root = ET.fromstring(response.content)
+    else:
+        root = ET.parse(location).getroot()
+
+    is_index = root.tag.endswith("sitemapindex")
+    for element in root.iter():
+        if element.tag.endswith("loc") and element.text:
+            loc = element.text.strip()
+            if is_index:
+                yield from read_sitemap(loc)
+            else:
+                yield loc
+
+# Read URLs from "-" (stdin), a sitemap (URL or .xml file) or a plain URL list file
+def read_urls(source):
+    if source == "-":
+        yield from read_url_file(sys.stdin)
+    elif source.startswith(("http://", "https://")) or source.endswith(".xml"):
+        yield from read_sitemap(source)
+    else:
+        with open(source, encoding="utf-8") as stream:
+            yield from read_url_file(stream)
+
+# ProcessPoolExecutor replaces workers after a number of tasks from Python 3.11 on;
+# on older versions a worker keeps its process and only replaces its browser
+RECYCLE_PROCESSES = sys.version_info >= (3, 11)
+
+# Driver pool of the current worker process, pages it has handled and its settings; started by _init_worker
+_worker_pool = None
+_worker_pages = 0
+_worker_settings = {}
+
+def _init_worker(profile=PROFILE_AUDIT, http2=False, pages_per_worker=None):
+    global _worker_pool
+    http_client.configure(http2=http2)
+    _worker_settings.update(factory=functools.partial(init_driver, headless=True, profile=profile), pages_per_worker=pages_per_worker)
+    _worker_pool = DriverPool(size=1, factory=_worker_settings["factory"])
+    # Quit Chrome when the worker exits, including when it is recycled
+    multiprocessing.util.Finalize(None, _close_worker_pool, exitpriority=10)
+
+def _close_worker_pool():
+    _worker_pool.close()
+
+# Start a new browser once the worker's has handled pages_per_worker pages; with
+# RECYCLE_PROCESSES the whole worker is replaced before that happens
+def _recycle_worker_browser():
+    global _worker_pool, _worker_pages
+    limit = _worker_settings.get("pages_per_worker")
+    if limit and _worker_pages >= limit:
+        _worker_pool.close()
+        _worker_pool = DriverPool(size=1, factory=_worker_settings["factory"])
+        _worker_pages = 0
+    _worker_pages += 1
+
+def _crawl_page(url, test_names, engine, js_pages, link_options):
+    _recycle_worker_browser()
+    tests = [test for test in with_link_options(TEST_SUITE, **link_options) if test[0] in test_names]
+    return run_page_tests(_worker_pool, url, tests, engine, re.compile(js_pages) if js_pages else None)
+
+# Crawl pages across worker processes, each driving its own headless browser
+def crawl(urls, test_names=DEFAULT_CRAWL_TESTS, workers=DEFAULT_WORKERS, pages_per_worker=DEFAULT_PAGES_PER_WORKER, max_pending=None, engine=ENGINE_BROWSER, js_pages=None, done=None, sink=None, profile=PROFILE_AUDIT, capture_network=False, http2=False, link_index=None, link_cache=DEFAULT_CACHE_PATH):
+    """
+    Run tests on many pages in parallel.
+
+    URLs are pulled from `urls` lazily and at most `max_pending` pages are
+    queued or running at once, so huge URL lists never sit in memory. Each
+    worker process is replaced after `pages_per_worker` pages to bound
+    Chrome's memory growth; before Python 3.11, which cannot replace pool
+    workers, only the worker's browser is replaced.
+
+    Args:
+        urls (iterable): Page URLs to check.
+        test_names (list): Names of TEST_SUITE entries to run on each page.
+        workers (int): Number of worker processes (and browsers).
+        pages_per_worker (int): Pages a worker handles before it is recycled.
+        max_pending (int): Maximum pages in flight; defaults to twice the worker count.
+        engine (str): ENGINE_BROWSER or ENGINE_STATIC; with the static engine a
+            worker only starts Chrome once a page or test needs it.
+        js_pages (str): Regular expression of URLs that always need the browser.
+        done (set): (test name, page URL) pairs finished by an earlier run, skipped.
+        sink (JsonlSink): Receives a started record for each page test as it is queued; optional.
+        profile (str): Browser profile of the workers, a key of driver_pool.PROFILES.
+        capture_network (bool): Take link statuses from the browser's network traffic
+            and only probe the links a page did not load.
+        http2 (bool): Fetch pages and check links over HTTP/2 in the workers.
+        link_index (str): Path of the run-wide link index, so every canonical URL is
+            checked once across all pages and workers; none if omitted.
+        link_cache (str): Path of the link status cache kept across runs, opened
+            once in each worker; None to check every link again.
+
+    Yields:
+        dict: Structured test results, as returned by report_model.run_tests.
+    """
+    max_pending = max_pending or workers * 2
+    link_options = {"capture_network": capture_network, "link_index": link_index, "link_cache": link_cache}
+    recycling = {"max_tasks_per_child": pages_per_worker} if RECYCLE_PROCESSES else {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(profile, http2, pages_per_worker), **recycling) as executor:
+        pending = {}
+        urls = iter(urls)
+        exhausted = False
+        while pending or not exhausted:
+            # Top up the queue without running ahead of the workers
+            while not exhausted and len(pending) < max_pending:
+                url = next(urls, None)
+                if url is None:
+                    exhausted = True
+                    break
+                page_tests = [name for name in test_names if not done or (name, url) not in done]
+                if page_tests:
+                    if sink is not None:
+                        for name in page_tests:
+                            emit_started(sink, name, url)
+                    pending[executor.submit(_crawl_page, url, page_tests, engine, js_pages, link_options)] = (url, page_tests)
+
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                url, page_tests = pending.pop(future)
+                try:
+                    yield from future.result()
+                except Exception as e:
+                    print(f"Error crawling {url}: {e}")
+                    for name in page_tests:
+                        yield {
+                            "name": name,
+                            "details": [],
+                            "summary": {"page_url": url, "testcase": name, "status": "Fail", "comments": f"Error: {e}"}
+                        }
+
+# Main function
+def main():
+    parser = argparse.ArgumentParser(description="Run the page tests over a list of URLs with a pool of browsers.")
+    parser.add_argument("urls", help="URL list file, sitemap URL or .xml file, or - for stdin")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of worker processes, each with its own browser")
+    parser.add_argument("--pages-per-worker", type=int, default=DEFAULT_PAGES_PER_WORKER, help="Recycle a worker and its browser after this many pages")
+    parser.add_argument("--max-pending", type=int, default=None, help="Maximum pages queued or running at once")
+    parser.add_argument("--tests", default=",".join(DEFAULT_CRAWL_TESTS), help="Comma-separated test names to run on each page")
+    parser.add_argument("--engine", choices=[ENGINE_BROWSER, ENGINE_STATIC], default=ENGINE_BROWSER, help="Run DOM-only tests on fetched HTML instead of in Chrome")
+    parser.add_argument("--js-pages", default=None, help="Regular expression of URLs that always need the browser")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted crawl: skip page tests already done, rerun the rest")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=PROFILE_AUDIT, help="Browser profile; the audit profile blocks images, media, fonts and trackers")
+    parser.add_argument("--capture-network", action="store_true", help="Use the statuses the browser saw while loading each page and only probe links it did not load")
+    parser.add_argument("--http2", action="store_true", help="Fetch pages and check links over HTTP/2 in the workers (needs httpx[http2])")
+    parser.add_argument("--no-cache", action="store_true", help="Check every link again instead of using the link status cache")
+    args = parser.parse_args()
+
+    test_names = [name.strip() for name in args.tests.split(",") if name.strip()]
+    unknown = set(test_names) - {test[0] for test in TEST_SUITE}
+    if unknown:
+        parser.error(f"Unknown test(s): {', '.join(sorted(unknown))}")
+
+    result_dir = "test_results"
+    ensure_directory(result_dir)
+    report_file = os.path.join(result_dir, "crawl_report.xlsx")
+    store_dir = os.path.join(result_dir, "crawl_results")
+    sink_path = os.path.join(result_dir, "crawl_results.jsonl")
+    index_path = os.path.join(result_dir, "crawl_link_index.sqlite")
+
+    # Results are streamed to the sink and the columnar store as pages finish;
+    # the workbook is rendered from the store at the end
+    with ResultStore(store_dir) as store:
+        done = None
+        if args.resume:
+            done, in_flight = read_checkpoint(sink_path, store)
+            print(f"Resuming: {len(done)} page test(s) already done, {in_flight} in flight will run again")
+        reset_index(index_path, keep_results=args.resume)
+        link_cache = None if args.no_cache else DEFAULT_CACHE_PATH
+        if link_cache:
+            # Create the cache before the workers open it concurrently; each worker opens its own
+            LinkStatusCache(link_cache).close()
+        with JsonlSink(sink_path, resume=args.resume) as sink:
+            for result in crawl(read_urls(args.urls), test_names, args.workers, args.pages_per_worker, args.max_pending, args.engine, args.js_pages, done, sink, args.profile, args.capture_network, args.http2, index_path, link_cache):
+                emit_result(sink, result)
+                store.append(result)
+    consolidate_results(functools.partial(read_results, store_dir), report_file)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Execution interrupted by user.")
@@ -0,0 +1,64 @@
+import logging
+
+# Runs in the page: for every spec, collect the requested fields of all matching elements.
+# "text" is the trimmed rendered text and "tagName" the lowercase tag name, like
+# WebElement.text and WebElement.tag_name. Other fields follow WebElement.get_attribute:
+# the DOM property when it is set (so src/href come back resolved), else the attribute.
+_EXTRACT_SCRIPT = """
+const specs = arguments[0];
+const read = (el, field) => {
+    if (field === "text") return (el.innerText || "").trim();
+    if (field === "tagName") return el.tagName.toLowerCase();
+    const value = el[field];
+    return value !== undefined && value !== null && typeof value !== "object" ? value : el.getAttribute(field);
+};
+const out = {};
+for (const [key, spec] of Object.entries(specs)) {
+    out[key] = Array.from(document.querySelectorAll(spec.selector), el => spec.fields.map(field => read(el, field)));
+}
+return out;
+"""
+
+# Element data the page checks use, in the same shape as static_engine.parse_html
+PAGE_SPECS = {
+    "headings": ("h1, h2, h3, h4, h5, h6", ["tagName", "text"]),
+    "h1_texts": ("h1", ["text"]),
+    "images": ("img", ["src", "alt"]),
+    "links": ("a", ["href"]),
+    "scripts": ("script", ["type", "textContent"]),
+}
+
+# Extract fields of several element sets in a single WebDriver round-trip
+def extract(driver, specs):
+    """
+    Read element data from the page with one execute_script call.
+
+    Args:
+        driver (webdriver): Selenium WebDriver instance showing the page.
+        specs (dict): Maps a result key to a (CSS selector, list of fields) pair.
+
+    Returns:
+        dict: Maps each key to a list of tuples, one per matching element in document order.
+    """
+    payload = {key: {"selector": selector, "fields": list(fields)} for key, (selector, fields) in specs.items()}
+    data = driver.execute_script(_EXTRACT_SCRIPT, payload)
+    return {key: [tuple(values) for values in data.get(key, [])] for key in specs}
+
+# Extract fields of all elements matching one selector
+def extract_elements(driver, selector, fields):
+    return extract(driver, {"elements": (selector, fields)})["elements"]
+
+# Extract everything the page checks need in one round-trip
+def extract_page_data(driver):
+    data = extract(driver, PAGE_SPECS)
+    logging.info(
+        f"Extracted {len(data['headings'])} headings, {len(data['images'])} images "
+        f"and {len(data['links'])} links in one call"
+    )
+    return {
+        "headings": data["headings"],
+        "h1_texts": [text for (text,) in data["h1_texts"]],
+        "images": data["images"],
+        "links": [href for (href,) in data["links"]],
+        "scripts": data["scripts"],
+    }
@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import queue
+import shutil
+import logging
+import tempfile
+import threading
+import functools
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from dom_extract import extract_page_data
+from readiness import WaitBudget, wait_for_page_ready, wait_for_elements, reset_performance_events
+
+# Environment variable pinning a local chromedriver binary; no lookup happens when it is set
+CHROMEDRIVER_PATH_ENV = "CHROMEDRIVER_PATH"
+
+# Machine-wide record of the last resolved chromedriver, shared by every process and run
+DRIVER_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "site-checks", "chromedriver.json")
+
+# How long a recorded chromedriver is trusted before it is looked up again, in seconds
+DRIVER_CACHE_TTL = 7 * 24 * 3600
+
+# Path recorded in the machine cache, if it is fresh and still points to a file
+def _read_driver_cache():
+    try:
+        with open(DRIVER_CACHE_FILE, encoding="utf-8") as stream:
+            entry = json.load(stream)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get("resolved_at", 0) > DRIVER_CACHE_TTL or not os.path.isfile(entry.get("path", "")):
+        return None
+    return entry["path"]
+
+# Record a resolved chromedriver; written atomically so concurrent workers never read half a file
+def _write_driver_cache(path):
+    try:
+        os.makedirs(os.path.dirname(DRIVER_CACHE_FILE), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(DRIVER_CACHE_FILE))
+        with os.fdopen(fd, "w", encoding="utf-8") as stream:
+            json.dump({"path": path, "resolved_at": time.time()}, stream)
+        os.replace(tmp_path, DRIVER_CACHE_FILE)
+    except OSError as e:
+        logging.warning(f"Could not record chromedriver path in {DRIVER_CACHE_FILE}: {e}")
+
+# Find the chromedriver binary once per process
+@functools.lru_cache(maxsize=None)
+def resolve_chromedriver(refresh=False):
+    """
+    Locate chromedriver without a network lookup whenever possible.
+
+    In order: the CHROMEDRIVER_PATH pin, the machine-wide cache (unless
+    `refresh`), webdriver-manager, and finally a chromedriver on PATH so
+    air-gapped runners still work. The result is cached for the process.
+
+    Args:
+        refresh (bool): Ignore the machine-wide cache and look the driver up again.
+
+    Returns:
+        str: Path of the chromedriver binary.
+    """
+    pinned = os.environ.get(CHROMEDRIVER_PATH_ENV)
+    if pinned:
+        if not os.path.isfile(pinned):
+            raise FileNotFoundError(f"{CHROMEDRIVER_PATH_ENV} points to a missing file: {pinned}")
+        return pinned
+
+    if not refresh:
+        cached = _read_driver_cache()
+        if cached:
+            return cached
+
+    try:
+        path = ChromeDriverManager().install()
+    except Exception as e:
+        path = shutil.which("chromedriver")
+        if path is None:
+            raise
+        logging.warning(f"Chromedriver lookup failed ({e}), using {path} from PATH")
+    _write_driver_cache(path)
+    return path
+
+# Browser profiles: "full" is a regular Chrome, "audit" a lean headless one for the DOM checks
+PROFILE_FULL = "full"
+PROFILE_AUDIT = "audit"
+
+# Analytics, ad and tag-manager hosts the audit profile never loads
+BLOCKED_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.io",
+    "criteo.com",
+]
+
+# Media and font files the audit profile never loads; images are disabled through Chrome settings
+BLOCKED_RESOURCES = ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.m3u8", "*.woff", "*.woff2", "*.ttf", "*.otf"]
+
+# Settings of each profile; add entries here for other trade-offs
+PROFILES = {
+    PROFILE_FULL: {
+        "headless": False,
+        "block_images": False,
+        "blocked_urls": [],
+        "window_size": None,
+        "arguments": [],
+    },
+    PROFILE_AUDIT: {
+        "headless": True,
+        "block_images": True,
+        "blocked_urls": [f"*{host}*" for host in BLOCKED_HOSTS] + BLOCKED_RESOURCES,
+        "window_size": (1280, 800),
+        "arguments": ["--disable-extensions", "--disable-gpu", "--mute-audio", "--disable-background-networking", "--disable-default-apps"],
+    },
+}
+
+# Chrome options of a browser profile
+def profile_options(profile=PROFILE_FULL, headless=False):
+    settings = PROFILES[profile]
+    options = webdriver.ChromeOptions()
+    if headless or settings["headless"]:
+        options.add_argument("--headless=new")
+    if settings["window_size"]:
+        options.add_argument("--window-size={},{}".format(*settings["window_size"]))
+    for argument in settings["arguments"]:
+        options.add_argument(argument)
+    if settings["block_images"]:
+        # Images are not downloaded, but <img> elements and their src/alt attributes stay in the DOM
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    # CDP network events feed readiness.network_idle
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+# Initialize WebDriver
+def init_driver(headless=False, profile=PROFILE_FULL):
+    """
+    Start Chrome with a browser profile.
+
+    Args:
+        headless (bool): Run without a window, whatever the profile says.
+        profile (str): Key of PROFILES; PROFILE_AUDIT trades images, media, fonts,
+            trackers and a large viewport for memory and load time.
+
+    Returns:
+        webdriver.Chrome: The started driver.
+    """
+    options = profile_options(profile, headless)
+    try:
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver()), options=options)
+    except SessionNotCreatedException:
+        if os.environ.get(CHROMEDRIVER_PATH_ENV):
+            raise
+        # Chrome was updated since the driver was cached; look it up again once
+        logging.warning("Cached chromedriver does not match Chrome, resolving it again")
+        resolve_chromedriver.cache_clear()
+        driver = webdriver.Chrome(service=Service(resolve_chromedriver(refresh=True)), options=options)
+    blocked_urls = PROFILES[profile]["blocked_urls"]
+    if blocked_urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+    driver.implicitly_wait(10)  # Wait for elements before raising exceptions
+    return driver
+
+# Load a page and wait until it is actually ready, within the check's budget
+def open_page(driver, url, budget=None):
+    reset_performance_events(driver)
+    driver.get(url)
+    return wait_for_page_ready(driver, budget or WaitBudget())
+
+class DriverPool:
+    """
+    Pool of reusable WebDriver instances.
+
+    Drivers are started lazily, up to `size`, and handed back to the pool
+    after use instead of being quit, so a run pays for each Chrome launch once.
+
+    Args:
+        size (int): Maximum number of drivers alive at once.
+        factory (callable): Creates a new driver; defaults to init_driver.
+    """
+
+    def __init__(self, size=1, factory=init_driver):
+        self.size = size
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    # Take a driver from the pool, starting a new one if the pool is not full yet
+    def acquire(self, timeout=None):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._drivers) < self.size:
+                driver = self.factory()
+                self._drivers.append(driver)
+                return driver
+        return self._idle.get(timeout=timeout)
+
+    # Return a driver to the pool
+    def release(self, driver):
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    # Quit every driver started by the pool
+    def close(self):
+        with self._lock:
+            for driver in self._drivers:
+                try:
+                    driver.quit()
+                except Exception as e:
+                    logging.warning(f"Error quitting WebDriver: {e}")
+            self._drivers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class PageSession:
+    """
+    One page loaded in a pooled driver and shared by several checks.
+
+    Read-only checks run against the already loaded DOM. A mutating check
+    (one that clicks or changes page state) gets a page no earlier check
+    has changed: the loaded one while it is still clean, else a reload.
+    It leaves the session marked dirty, so the next check reloads it.
+
+    Args:
+        pool (DriverPool): Pool the driver is borrowed from.
+        url (str): URL of the page.
+    """
+
+    def __init__(self, pool, url):
+        self.pool = pool
+        self.url = url
+        self.driver = None
+        self.page_loads = 0
+        self._clean = False
+        self._snapshot = None
+
+    def __enter__(self):
+        self.driver = self.pool.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.pool.release(self.driver)
+        self.driver = None
+
+    def _load(self):
+        logging.info(f"Loading page: {self.url}")
+        open_page(self.driver, self.url)
+        self.page_loads += 1
+        self._clean = True
+        self._snapshot = None
+
+    # Driver showing the page, loaded once and shared by read-only checks
+    def for_read(self):
+        if not self._clean:
+            self._load()
+        return self.driver
+
+    # Element data of the loaded page, extracted in one round-trip and shared by read-only checks
+    def snapshot(self):
+        driver = self.for_read()
+        if self._snapshot is None:
+            # The snapshot feeds the image and link checks, so let lazily rendered ones appear first
+            wait_for_elements(driver, "img, a[href]", "images and links settled")
+            self._snapshot = extract_page_data(driver)
+        return self._snapshot
+
+    # Driver showing an unchanged copy of the page for a check that changes it, reloading only if one already did
+    def for_mutation(self):
+        if not self._clean:
+            self._load()
+        self._clean = False
+        self._snapshot = None
+        return self.driver
@@ -0,0 +1,145 @@
+import math
+from copy import copy
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, Border, Side, PatternFill, NamedStyle
+from openpyxl.utils import get_column_letter
+
+# Named styles shared by every cell of a report, registered once per workbook
+HEADER_STYLE = "Report Header"
+CELL_STYLE = "Report Cell"
+
+# Padding added to the longest value of a column, for visibility
+WIDTH_PADDING = 5
+
+def _named_styles():
+    alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    border = Border(
+        left=Side(style="thin"),
+        right=Side(style="thin"),
+        top=Side(style="thin"),
+        bottom=Side(style="thin")
+    )
+    header = NamedStyle(
+        name=HEADER_STYLE,
+        font=Font(bold=True, color="FFFFFF"),
+        fill=PatternFill("solid", fgColor="4F81BD"),
+        alignment=alignment,
+        border=border
+    )
+    cell = NamedStyle(name=CELL_STYLE, alignment=alignment, border=border)
+    return header, cell
+
+# Convert a value to something openpyxl can write; missing values become empty cells
+def _cell_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, (list, tuple, dict, set)):
+        return str(value)
+    return value
+
+# Compute column widths from the data: longest non-empty value (header included) plus padding
+def column_widths(columns, rows):
+    widths = [len(str(column)) if column else 0 for column in columns]
+    for row in rows:
+        for index, value in enumerate(row):
+            value = _cell_value(value)
+            if value:
+                widths[index] = max(widths[index], len(str(value)))
+    return [width + WIDTH_PADDING for width in widths]
+
+# Start a write-only workbook with the report styles registered
+def open_workbook():
+    wb = Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+    return wb
+
+# Stream one sheet of rows into a write-only workbook
+def write_sheet(wb, title, columns, rows, widths=None):
+    """
+    Add a formatted sheet to a workbook opened with open_workbook.
+
+    Rows are written as they are iterated and never held by the workbook.
+    Column widths must be known before the first row is written, so when
+    `widths` is not given the rows are materialized once to measure them.
+
+    Args:
+        wb (Workbook): Write-only workbook from open_workbook.
+        title (str): Sheet name.
+        columns (list): Header labels.
+        rows (iterable): Row value sequences, in column order.
+        widths (list): Column widths; computed from the data if omitted.
+    """
+    if widths is None:
+        rows = list(rows)
+        widths = column_widths(columns, rows)
+
+    ws = wb.create_sheet(title=title)
+    for index, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+
+    # Resolve each named style once; every cell then shares a copy of its style array
+    header_style = _style_array(ws, HEADER_STYLE)
+    cell_style = _style_array(ws, CELL_STYLE)
+
+    ws.append([_styled_cell(ws, column, header_style) for column in columns])
+    for row in rows:
+        ws.append([_styled_cell(ws, _cell_value(value), cell_style) for value in row])
+    return ws
+
+def _style_array(ws, style):
+    cell = WriteOnlyCell(ws)
+    cell.style = style
+    return cell._style
+
+def _styled_cell(ws, value, style_array):
+    cell = WriteOnlyCell(ws, value=value)
+    cell._style = copy(style_array)
+    return cell
+
+# Header labels and column widths of dict records, measured in one pass over them
+def measure_records(records):
+    widths = {}
+    for record in records:
+        for column, value in record.items():
+            if column not in widths:
+                widths[column] = len(str(column)) if column else 0
+            value = _cell_value(value)
+            if value:
+                widths[column] = max(widths[column], len(str(value)))
+    return list(widths), [width + WIDTH_PADDING for width in widths.values()]
+
+# Header labels for a sequence of dict records: every key, in first-seen order
+def record_columns(records):
+    columns = {}
+    for record in records:
+        for key in record:
+            columns.setdefault(key, None)
+    return list(columns)
+
+# Row tuples for dict records, lazily, in the given column order
+def record_rows(records, columns):
+    return (tuple(record.get(column) for column in columns) for record in records)
+
+# Header labels and row tuples of a DataFrame, ready for write_sheet
+def dataframe_rows(df):
+    return [str(column) for column in df.columns], list(df.itertuples(index=False, name=None))
+
+# Save DataFrame to Excel with auto-adjusted column widths and formatting
+def save_with_auto_width(filepath, df, sheet_name=None):
+    """
+    Save a DataFrame to an Excel file, auto-adjust column widths, and enhance formatting.
+
+    The workbook is written in a single streaming pass: widths are computed
+    from the data first, then rows are written with shared named styles.
+
+    Args:
+        filepath (str): Path to save the Excel file.
+        df (pd.DataFrame): DataFrame to save.
+        sheet_name (str): Name of the sheet; "Sheet1" if omitted.
+    """
+    wb = open_workbook()
+    columns, rows = dataframe_rows(df)
+    write_sheet(wb, sheet_name or "Sheet1", columns, rows)
+    wb.save(filepath)
@@ -0,0 +1,138 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+# Requests per second a host starts with, and the most it is ever allowed
+DEFAULT_HOST_RATE = 10.0
+MAX_HOST_RATE = 50.0
+
+# Status codes meaning the host wants us to slow down
+THROTTLE_CODES = (429, 503)
+
+# Longest Retry-After honoured, and the pause used when a throttling response has none, in seconds
+MAX_RETRY_AFTER = 60.0
+DEFAULT_RETRY_AFTER = 2.0
+
+# A response this many times slower than the host's average counts as a latency spike
+LATENCY_SPIKE_FACTOR = 3.0
+LATENCY_SAMPLES = 5
+LATENCY_SMOOTHING = 0.2
+
+# Limiters shared by every page checked in this process, by max_concurrency
+_shared = {}
+_shared_lock = threading.Lock()
+
+# Seconds to wait before a throttled request may be retried, from a Retry-After header
+def parse_retry_after(value):
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return DEFAULT_RETRY_AFTER
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+class _HostState:
+    def __init__(self, max_concurrency, rate):
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self.rate = rate
+        self.tokens = 1.0
+        self.refilled = time.monotonic()
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.latency = None
+        self.samples = 0
+
+class HostLimiter:
+    """
+    Per-host token bucket with AIMD adaptive concurrency.
+
+    Each host gets a request rate (token bucket) and a concurrency limit.
+    Both are halved when the host throttles (429/503) or times out, and
+    the concurrency limit is also halved on a latency spike. Throttling
+    also pauses the host for its Retry-After. Each success grows them
+    again additively, up to `max_concurrency` and MAX_HOST_RATE, so every
+    host runs as fast as it tolerates.
+
+    Args:
+        max_concurrency (int): Most requests in flight against one host.
+        rate (float): Requests per second a host starts with.
+    """
+
+    def __init__(self, max_concurrency, rate=DEFAULT_HOST_RATE):
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self._hosts = {}
+        self._condition = threading.Condition()
+
+    def _state(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.max_concurrency, self.rate)
+        return self._hosts[host]
+
+    # Seconds until the host may take another request; 0 when a request can start now
+    def _wait_time(self, state):
+        now = time.monotonic()
+        if state.paused_until > now:
+            return state.paused_until - now
+        if state.in_flight >= max(1, int(state.concurrency)):
+            return None
+        state.tokens = min(max(1.0, state.concurrency), state.tokens + (now - state.refilled) * state.rate)
+        state.refilled = now
+        if state.tokens < 1.0:
+            return (1.0 - state.tokens) / state.rate
+        return 0.0
+
+    # Hold a request slot for a host, waiting for the pause, concurrency limit and rate
+    @contextmanager
+    def slot(self, host):
+        with self._condition:
+            state = self._state(host)
+            while True:
+                wait = self._wait_time(state)
+                if wait == 0.0:
+                    break
+                self._condition.wait(wait)
+            state.tokens -= 1.0
+            state.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                state.in_flight -= 1
+                self._condition.notify_all()
+
+    # Adapt a host's limits to the outcome of one request; status_code is None for a timeout
+    def record(self, host, status_code, elapsed, retry_after=None):
+        with self._condition:
+            state = self._state(host)
+            if status_code is None or status_code in THROTTLE_CODES:
+                state.concurrency = max(1.0, state.concurrency / 2)
+                state.rate = max(0.5, state.rate / 2)
+                if status_code is not None:
+                    state.paused_until = max(state.paused_until, time.monotonic() + parse_retry_after(retry_after))
+                logging.info(f"Host {host} throttled ({status_code or 'timeout'}), concurrency {state.concurrency:.1f}, rate {state.rate:.1f}/s")
+            elif state.samples >= LATENCY_SAMPLES and elapsed > LATENCY_SPIKE_FACTOR * state.latency:
+                state.concurrency = max(1.0, state.concurrency / 2)
+                logging.info(f"Host {host} slowed down ({elapsed:.2f}s), concurrency {state.concurrency:.1f}")
+            else:
+                state.concurrency = min(state.max_concurrency, state.concurrency + 1.0 / state.concurrency)
+                state.rate = min(MAX_HOST_RATE, state.rate + 1.0 / state.rate)
+
+            if status_code is not None:
+                state.latency = elapsed if state.latency is None else (1 - LATENCY_SMOOTHING) * state.latency + LATENCY_SMOOTHING * elapsed
+                state.samples += 1
+            self._condition.notify_all()
+
+# The process-wide limiter, so what it learns about a host carries over from page to page
+def shared_limiter(max_concurrency):
+    with _shared_lock:
+        if max_concurrency not in _shared:
+            _shared[max_concurrency] = HostLimiter(max_concurrency)
+        return _shared[max_concurrency]
@@ -0,0 +1,175 @@
+import time
+import socket
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+# Connections kept alive per host, and number of hosts whose pools are kept
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_POOL_HOSTS = 32
+
+# Retries for connection errors and transient server errors, on http and https alike
+DEFAULT_RETRIES = 5
+RETRY_BACKOFF = 1
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# How long resolved host addresses are reused, in seconds
+DEFAULT_DNS_TTL = 300
+
+# Settings of the shared client; change them with configure() before the first request
+_settings = {"pool_maxsize": DEFAULT_POOL_MAXSIZE, "http2": False, "dns_ttl": DEFAULT_DNS_TTL}
+_shared = {}
+_shared_lock = threading.Lock()
+
+# Build a requests session with keep-alive pools and retries mounted for http and https
+def build_session(pool_maxsize=DEFAULT_POOL_MAXSIZE, retries=DEFAULT_RETRIES, limited=False):
+    """
+    Build a requests session with keep-alive pools and retries.
+
+    Args:
+        pool_maxsize (int): Connections kept alive per host.
+        retries (int): Retries of connection errors and transient server errors.
+        limited (bool): The session's requests go through a HostLimiter. Responses are
+            then returned as they are and failed connections are retried at once, so
+            no backoff runs while a host slot is held; the link checker retries
+            statuses itself, outside the slot.
+
+    Returns:
+        requests.Session: The session.
+    """
+    session = requests.Session()
+    if limited:
+        retry = Retry(total=retries, backoff_factor=0, status_forcelist=[], respect_retry_after_header=False)
+    else:
+        retry = Retry(total=retries, backoff_factor=RETRY_BACKOFF, status_forcelist=list(RETRY_STATUSES))
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=DEFAULT_POOL_HOSTS, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+class Http2Session:
+    """
+    HTTP/2 client with the subset of the requests.Session API the checks use.
+
+    Requests to the same host are multiplexed over one connection, so a
+    page full of links to a few CDN hosts needs a handful of TLS
+    handshakes. Needs the optional httpx[http2] package. Errors are raised
+    as requests exceptions, so callers handle both clients the same way.
+
+    Args:
+        pool_maxsize (int): Connections kept alive per host.
+        retries (int): Retries of failed connection attempts.
+    """
+
+    def __init__(self, pool_maxsize=DEFAULT_POOL_MAXSIZE, retries=DEFAULT_RETRIES):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("HTTP/2 needs the httpx package: pip install 'httpx[http2]'")
+        self._httpx = httpx
+        limits = httpx.Limits(max_connections=pool_maxsize * DEFAULT_POOL_HOSTS, max_keepalive_connections=pool_maxsize * DEFAULT_POOL_HOSTS)
+        self._client = httpx.Client(transport=httpx.HTTPTransport(http2=True, verify=False, limits=limits, retries=retries))
+
+    def request(self, method, url, timeout=None, verify=None, allow_redirects=True, stream=False, headers=None):
+        httpx = self._httpx
+        try:
+            request = self._client.build_request(method, url, headers=headers, timeout=timeout)
+            response = self._client.send(request, stream=stream, follow_redirects=allow_redirects)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e))
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+        return _Http2Response(response)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("allow_redirects", True)
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        self._client.close()
+
+class _Http2Response:
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+
+    @property
+    def content(self):
+        return self._response.read()
+
+    @property
+    def text(self):
+        self._response.read()
+        return self._response.text
+
+    def close(self):
+        self._response.close()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+# Reuse resolved addresses for `ttl` seconds instead of resolving every new connection
+def enable_dns_cache(ttl=DEFAULT_DNS_TTL):
+    if getattr(socket.getaddrinfo, "dns_cache", False):
+        return
+    resolve = socket.getaddrinfo
+    cache = {}
+    lock = threading.Lock()
+
+    def getaddrinfo(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with lock:
+            entry = cache.get(key)
+        if entry is not None and now - entry[0] < ttl:
+            return entry[1]
+        addresses = resolve(*args, **kwargs)
+        with lock:
+            cache[key] = (now, addresses)
+        return addresses
+    getaddrinfo.dns_cache = True
+    socket.getaddrinfo = getaddrinfo
+
+# Change the settings of the shared client; takes effect if it has not been created yet
+def configure(pool_maxsize=None, http2=None, dns_ttl=None):
+    if _shared:
+        logging.warning("HTTP client already in use, new settings are ignored")
+    for key, value in (("pool_maxsize", pool_maxsize), ("http2", http2), ("dns_ttl", dns_ttl)):
+        if value is not None:
+            _settings[key] = value
+
+# The process-wide HTTP client, shared by every page and test so connections stay warm
+def get_session(limited=False):
+    """
+    Return the shared, long-lived HTTP client of this process.
+
+    It is created on first use with the configure() settings: an
+    Http2Session when HTTP/2 is enabled, else a requests session from
+    build_session. Host lookups are cached for the configured TTL.
+
+    Args:
+        limited (bool): Return the client for requests paced by a HostLimiter,
+            which leaves status retries to the caller (see build_session).
+
+    Returns:
+        requests.Session or Http2Session: The shared client.
+    """
+    with _shared_lock:
+        if limited not in _shared:
+            if _settings["dns_ttl"]:
+                enable_dns_cache(_settings["dns_ttl"])
+            if _settings["http2"]:
+                # httpx only retries failed connections, never statuses, so one client serves both
+                _shared[limited] = _shared.get(not limited) or Http2Session(_settings["pool_maxsize"])
+            else:
+                _shared[limited] = build_session(_settings["pool_maxsize"], limited=limited)
+        return _shared[limited]
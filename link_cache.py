@@ -0,0 +1,157 @@
+import os
+import time
+import sqlite3
+import logging
+import functools
+import threading
+
+from url_normalize import normalize
+
+# Default on-disk location of the link status cache
+DEFAULT_CACHE_PATH = os.path.join("test_results", "link_status_cache.sqlite")
+
+# How long (in seconds) a cached result stays fresh, per status class
+DEFAULT_TTLS = {
+    "2xx": 24 * 60 * 60,
+    "3xx": 24 * 60 * 60,
+    "4xx": 6 * 60 * 60,
+    "5xx": 15 * 60,
+    "error": 5 * 60,
+}
+
+# Build the cache key for a URL: its normalized form, shared with the run-wide link index
+def cache_key(url):
+    return normalize(url)
+
+# Map a stored status code to its TTL class
+def status_class(status_code):
+    if isinstance(status_code, int) and 100 <= status_code < 600:
+        return f"{status_code // 100}xx"
+    return "error"
+
+class LinkStatusCache:
+    """
+    SQLite-backed cache of link check results shared across runs.
+
+    Entries are keyed by normalized URL and expire according to the TTL of
+    their status class. Stale entries that carry an ETag or Last-Modified
+    header can be revalidated with a conditional request instead of a full
+    re-check. The cache is safe to use from the link checker's worker threads.
+
+    Args:
+        path (str): SQLite file to use; its directory is created if missing.
+        ttls (dict): Overrides for DEFAULT_TTLS, keyed by status class.
+        revalidate (bool): Whether stale entries are revalidated with ETag/Last-Modified.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, revalidate=True):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.revalidate = revalidate
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS link_status ("
+            " url TEXT PRIMARY KEY,"
+            " status TEXT,"
+            " status_code INTEGER,"
+            " error_message TEXT,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " checked_at REAL)"
+        )
+        self._conn.commit()
+
+    def _fetch(self, url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT status, status_code, error_message, etag, last_modified, checked_at FROM link_status WHERE url = ?",
+                (cache_key(url),)
+            ).fetchone()
+
+    @staticmethod
+    def _to_row(url, entry):
+        status, status_code, error_message = entry[:3]
+        return {
+            "URL": url,
+            "Status": status,
+            "HTTP Status Code": status_code if status_code is not None else "N/A",
+            "Error Message": error_message
+        }
+
+    # Return the cached row for a URL if it is still fresh, else None
+    def lookup(self, url):
+        entry = self._fetch(url)
+        if entry is None:
+            return None
+        ttl = self.ttls.get(status_class(entry[1]), 0)
+        if time.time() - entry[5] > ttl:
+            return None
+        return self._to_row(url, entry)
+
+    # Return conditional request headers for a stale entry, if it can be revalidated
+    def validators(self, url):
+        if not self.revalidate:
+            return {}
+        entry = self._fetch(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry[3]:
+            headers["If-None-Match"] = entry[3]
+        if entry[4]:
+            headers["If-Modified-Since"] = entry[4]
+        return headers
+
+    # Mark a stored entry fresh again after a 304 and return its row
+    def revalidated(self, url):
+        entry = self._fetch(url)
+        if entry is None:
+            return None
+        with self._lock:
+            self._conn.execute("UPDATE link_status SET checked_at = ? WHERE url = ?", (time.time(), cache_key(url)))
+            self._conn.commit()
+        return self._to_row(url, entry)
+
+    # Store the result row of a fresh check
+    def store(self, url, row, etag=None, last_modified=None):
+        status_code = row["HTTP Status Code"]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO link_status VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    cache_key(url),
+                    row["Status"],
+                    status_code if isinstance(status_code, int) else None,
+                    row["Error Message"],
+                    etag,
+                    last_modified,
+                    time.time(),
+                )
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        logging.info(f"Link status cache saved to {self.path}")
+
+# The cache at `path` of this process, shared by every page checked in it
+@functools.lru_cache(maxsize=None)
+def open_cache(path=DEFAULT_CACHE_PATH):
+    return LinkStatusCache(path)
+
+# Parse "CLASS=SECONDS" TTL overrides from the command line
+def parse_ttl_overrides(values):
+    ttls = {}
+    for value in values or []:
+        name, _, seconds = value.partition("=")
+        name = name.strip().lower()
+        if name not in DEFAULT_TTLS or not seconds.strip().isdigit():
+            raise ValueError(f"Invalid cache TTL '{value}', expected one of {', '.join(DEFAULT_TTLS)}=SECONDS")
+        ttls[name] = int(seconds)
+    return ttls
@@ -0,0 +1,207 @@
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from http_client import get_session, RETRY_BACKOFF, RETRY_STATUSES
+from host_limiter import shared_limiter, THROTTLE_CODES
+
+# Default limits for concurrent link checking
+DEFAULT_MAX_WORKERS = 32
+DEFAULT_PER_HOST_LIMIT = 4
+DEFAULT_TIMEOUT = 5
+
+# Probe modes: "head" sends HEAD first and falls back to a streamed GET, "get" always streams a GET
+PROBE_HEAD = "head"
+PROBE_GET = "get"
+DEFAULT_PROBE_MODE = PROBE_HEAD
+
+# Status codes meaning the server does not support HEAD for this resource
+HEAD_REJECTED_CODES = (405, 501)
+
+# Times a throttled (429/503) link is retried after the host's Retry-After
+THROTTLE_RETRIES = 3
+
+# Server errors retried with backoff when a host limiter is used, and times they are retried
+SERVER_ERROR_CODES = tuple(status for status in RETRY_STATUSES if status not in THROTTLE_CODES)
+SERVER_ERROR_RETRIES = 2
+
+# Probe a link for its status, never reading the response body
+def probe_link(session, link, timeout=DEFAULT_TIMEOUT, probe_mode=DEFAULT_PROBE_MODE, headers=None):
+    """
+    Request a link without downloading its body.
+
+    Args:
+        session (requests.Session): Session used for the request.
+        link (str): URL to probe.
+        timeout (float): Request timeout in seconds.
+        probe_mode (str): PROBE_HEAD or PROBE_GET.
+        headers (dict): Extra request headers, e.g. conditional validators.
+
+    Returns:
+        requests.Response: The final, already closed response.
+    """
+    if probe_mode == PROBE_HEAD:
+        response = session.head(link, timeout=timeout, verify=False, allow_redirects=True, headers=headers)
+        response.close()
+        if response.status_code not in HEAD_REJECTED_CODES:
+            return response
+
+    # Stream the GET so the body is never read; closing releases the connection
+    response = session.get(link, timeout=timeout, verify=False, stream=True, headers=headers)
+    response.close()
+    return response
+
+# Probe a link within its host's limits, retrying when the host throttles us or fails
+def _probe_limited(session, link, timeout, probe_mode, headers, limiter):
+    if limiter is None:
+        return probe_link(session, link, timeout, probe_mode, headers)
+
+    host = urlsplit(link).netloc.lower()
+    throttled = server_errors = 0
+    while True:
+        with limiter.slot(host):
+            start = time.monotonic()
+            try:
+                response = probe_link(session, link, timeout, probe_mode, headers)
+            except requests.exceptions.Timeout:
+                limiter.record(host, None, time.monotonic() - start)
+                raise
+            limiter.record(host, response.status_code, time.monotonic() - start, response.headers.get("Retry-After"))
+        if response.status_code in THROTTLE_CODES and throttled < THROTTLE_RETRIES:
+            # The limiter pauses the host for its Retry-After before the next slot
+            throttled += 1
+            logging.info(f"Throttled URL: {link}, HTTP Code: {response.status_code}, attempt {throttled}")
+        elif response.status_code in SERVER_ERROR_CODES and server_errors < SERVER_ERROR_RETRIES:
+            # Back off outside the slot, so other links to the host are not held up
+            server_errors += 1
+            logging.info(f"Server error URL: {link}, HTTP Code: {response.status_code}, attempt {server_errors}")
+            time.sleep(RETRY_BACKOFF * 2 ** (server_errors - 1))
+        else:
+            return response
+
+# Check a single link and build its result row
+def check_link(session, link, timeout=DEFAULT_TIMEOUT, probe_mode=DEFAULT_PROBE_MODE, cache=None, limiter=None):
+    """
+    Request a link and classify the response.
+
+    Args:
+        session (requests.Session): Session used for the request.
+        link (str): URL to check.
+        timeout (float): Request timeout in seconds.
+        probe_mode (str): PROBE_HEAD or PROBE_GET.
+        cache (LinkStatusCache): Optional cache consulted before and updated after the request.
+        limiter (HostLimiter): Optional per-host rate and concurrency limiter; throttled
+            requests are retried after the host's Retry-After and server errors with backoff.
+
+    Returns:
+        dict: Row with "URL", "Status", "HTTP Status Code" and "Error Message" keys.
+    """
+    validators = {}
+    if cache is not None:
+        cached = cache.lookup(link)
+        if cached is not None:
+            logging.info(f"Cached URL: {link}, Status: {cached['Status']}, HTTP Code: {cached['HTTP Status Code']}")
+            return cached
+        validators = cache.validators(link)
+
+    status = "Pass"
+    error_message = ""
+    status_code = ""
+    response = None
+
+    try:
+        response = _probe_limited(session, link, timeout, probe_mode, validators, limiter)
+        status_code = response.status_code
+        if status_code == 304 and validators:
+            cached = cache.revalidated(link)
+            if cached is not None:
+                logging.info(f"Revalidated URL: {link}, Status: {cached['Status']}, HTTP Code: {cached['HTTP Status Code']}")
+                return cached
+        if status_code == 404:
+            status = "Fail"
+            error_message = "404 Not Found"
+        elif status_code in THROTTLE_CODES and limiter is not None:
+            status = "Fail"
+            error_message = f"Still throttled ({status_code}) after {THROTTLE_RETRIES} retries"
+        elif status_code in SERVER_ERROR_CODES and limiter is not None:
+            status = "Fail"
+            error_message = f"Error: too many {status_code} error responses"
+        else:
+            status = "pass"
+    except requests.exceptions.Timeout:
+        status = "Fail"
+        error_message = "Timeout"
+    except requests.exceptions.RequestException as e:
+        status = "Fail"
+        error_message = f"Error: {e}"
+
+    logging.info(f"Checked URL: {link}, Status: {status}, HTTP Code: {status_code}, Error: {error_message}")
+    row = {
+        "URL": link,
+        "Status": status,
+        "HTTP Status Code": status_code if status_code else "N/A",
+        "Error Message": error_message if error_message else "None"
+    }
+    # A throttled link is left to the limiter on the next run, not served from the cache
+    if cache is not None and status_code not in THROTTLE_CODES:
+        headers = response.headers if response is not None else {}
+        cache.store(link, row, headers.get("ETag"), headers.get("Last-Modified"))
+    return row
+
+# Interleave links by host so workers are spread across hosts instead of queueing on one
+def _interleave_by_host(links):
+    by_host = OrderedDict()
+    for index, link in enumerate(links):
+        by_host.setdefault(urlsplit(link).netloc.lower(), []).append(index)
+
+    order = []
+    queues = list(by_host.values())
+    while queues:
+        for queue in queues:
+            order.append(queue.pop(0))
+        queues = [queue for queue in queues if queue]
+    return order
+
+# Check many links concurrently, keeping results in the order of the input
+def check_links(links, session=None, max_workers=DEFAULT_MAX_WORKERS, per_host_limit=DEFAULT_PER_HOST_LIMIT, timeout=DEFAULT_TIMEOUT, probe_mode=DEFAULT_PROBE_MODE, cache=None, limiter=None):
+    """
+    Check links with a bounded thread pool.
+
+    At most `max_workers` requests are in flight overall. Each host is
+    limited by a HostLimiter: at most `per_host_limit` requests at once,
+    fewer while it throttles or slows down, and a per-host request rate.
+
+    Args:
+        links (list): URLs to check.
+        session (requests.Session): Session to use; the shared http_client one if omitted.
+        max_workers (int): Global concurrency limit.
+        per_host_limit (int): Concurrency limit per host.
+        timeout (float): Request timeout in seconds.
+        probe_mode (str): PROBE_HEAD or PROBE_GET.
+        cache (LinkStatusCache): Optional persistent cache of link results.
+        limiter (HostLimiter): Limiter to use; the process-wide one for `per_host_limit` if omitted.
+
+    Returns:
+        list: One result row per link, in the same order as `links`.
+    """
+    if not links:
+        return []
+    if session is None:
+        # Throttling is left to the limiter, not retried inside the HTTP client
+        session = get_session(limited=True)
+
+    if limiter is None:
+        limiter = shared_limiter(per_host_limit)
+
+    def run(index):
+        return index, check_link(session, links[index], timeout, probe_mode, cache, limiter)
+
+    results = [None] * len(links)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(links)))) as executor:
+        for index, row in executor.map(run, _interleave_by_host(links)):
+            results[index] = row
+    return results
@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import functools
+
+from url_normalize import normalize
+
+# Default location of the run-wide link index
+DEFAULT_INDEX_PATH = os.path.join("test_results", "link_index.sqlite")
+
+# How long to wait for a link another page or worker is checking, in seconds
+DEFAULT_WAIT_TIMEOUT = 60
+
+# Delay between polls while waiting for other checkers, in seconds
+POLL_INTERVAL = 0.2
+
+class LinkIndex:
+    """
+    Run-wide index of checked links, shared by pages, threads and worker processes.
+
+    Links are keyed by their normalized URL. A checker claims the links it
+    will check; links already checked in this run come back with their
+    result, and links claimed by another checker can be waited for, so
+    each canonical URL is requested once per run and its result fans out
+    to every page that links to it.
+
+    Args:
+        path (str): SQLite file of the run; its directory is created if missing.
+        wait_timeout (float): How long wait() waits for other checkers, in seconds.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, wait_timeout=DEFAULT_WAIT_TIMEOUT):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS links (url TEXT PRIMARY KEY, row TEXT, claimed_at REAL)")
+        self._conn.commit()
+
+    # Claim links for checking; returns (known rows by key, keys to check, keys another checker has)
+    def claim(self, keys):
+        known, claimed, pending = {}, [], []
+        with self._lock:
+            for key in keys:
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO links (url, row, claimed_at) VALUES (?, NULL, ?)", (key, time.time())
+                ).rowcount
+                if inserted:
+                    claimed.append(key)
+                    continue
+                (row,) = self._conn.execute("SELECT row FROM links WHERE url = ?", (key,)).fetchone()
+                if row is None:
+                    pending.append(key)
+                else:
+                    known[key] = json.loads(row)
+            self._conn.commit()
+        return known, claimed, pending
+
+    # Record the result of a claimed link
+    def store(self, key, row):
+        with self._lock:
+            self._conn.execute("UPDATE links SET row = ? WHERE url = ?", (json.dumps(row), key))
+            self._conn.commit()
+
+    # Wait for links other checkers are working on; returns the rows that arrived in time
+    def wait(self, keys):
+        rows = {}
+        remaining = list(keys)
+        deadline = time.monotonic() + self.wait_timeout
+        while remaining:
+            with self._lock:
+                for key in remaining:
+                    (row,) = self._conn.execute("SELECT row FROM links WHERE url = ?", (key,)).fetchone()
+                    if row is not None:
+                        rows[key] = json.loads(row)
+            remaining = [key for key in remaining if key not in rows]
+            if not remaining or time.monotonic() >= deadline:
+                break
+            time.sleep(POLL_INTERVAL)
+        return rows
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# Start a fresh index for a new run, or keep the checked links of a resumed one
+def reset_index(path=DEFAULT_INDEX_PATH, keep_results=False):
+    open_index.cache_clear()
+    if keep_results and os.path.exists(path):
+        # Claims of the interrupted run will never be delivered
+        index = LinkIndex(path)
+        with index._lock:
+            index._conn.execute("DELETE FROM links WHERE row IS NULL")
+            index._conn.commit()
+        index.close()
+        return
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+# The index at `path`, opened once per process
+@functools.lru_cache(maxsize=None)
+def open_index(path=DEFAULT_INDEX_PATH):
+    return LinkIndex(path)
+
+# Group links by normalized URL; returns {key: first link in page order}
+def canonical_links(links):
+    canonical = {}
+    for link in links:
+        canonical.setdefault(normalize(link), link)
+    return canonical
@@ -0,0 +1,87 @@
+import logging
+from collections import OrderedDict
+
+from readiness import read_performance_events
+
+# Load errors that say nothing about the target: blocked on purpose (browser profile) or cancelled by the page
+IGNORED_ERRORS = ("net::ERR_BLOCKED_BY_CLIENT", "net::ERR_ABORTED")
+
+# Final outcome of every http(s) request the page made, from CDP Network events
+def captured_responses(events):
+    """
+    Reduce CDP Network events to one entry per requested URL.
+
+    Redirects keep their requestId, so every URL of a redirect chain gets
+    the status of the final response, like a probe with allow_redirects.
+
+    Args:
+        events (list): CDP events, as returned by readiness.read_performance_events.
+
+    Returns:
+        OrderedDict: Maps each URL, in request order, to a dict with "status"
+        (int or None), "error" (str or None), "type" (resource type) and
+        "time_ms" (request start to finish, or None if it never finished).
+    """
+    chains = {}
+    outcomes = {}
+    for event in events:
+        method = event.get("method")
+        params = event.get("params", {})
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            outcomes.setdefault(request_id, {"status": None, "error": None, "type": params.get("type"), "start": params.get("timestamp"), "end": None})
+            chains.setdefault(request_id, []).append(params["request"]["url"])
+        elif request_id not in outcomes:
+            continue
+        elif method == "Network.responseReceived":
+            outcomes[request_id]["status"] = params["response"].get("status")
+        elif method == "Network.loadingFinished":
+            outcomes[request_id]["end"] = params.get("timestamp")
+        elif method == "Network.loadingFailed":
+            outcomes[request_id]["error"] = "net::ERR_BLOCKED_BY_CLIENT" if params.get("blockedReason") else params.get("errorText")
+            outcomes[request_id]["end"] = params.get("timestamp")
+
+    responses = OrderedDict()
+    for request_id, urls in chains.items():
+        outcome = outcomes[request_id]
+        if outcome["error"] in IGNORED_ERRORS or (outcome["status"] is None and outcome["error"] is None):
+            continue
+        time_ms = None
+        if outcome["start"] is not None and outcome["end"] is not None:
+            time_ms = round((outcome["end"] - outcome["start"]) * 1000, 1)
+        for url in urls:
+            if url.startswith("http") and url not in responses:
+                responses[url] = {"status": outcome["status"], "error": outcome["error"], "type": outcome["type"], "time_ms": time_ms}
+    return responses
+
+# Network responses the driver saw while loading the current page; empty without performance logging
+def page_responses(driver):
+    try:
+        return captured_responses(read_performance_events(driver))
+    except Exception as e:
+        logging.warning(f"No network events available, all links will be probed: {e}")
+        return OrderedDict()
+
+# Link status row for a response the browser already received, in the shape of link_checker.check_link
+def captured_row(url, response):
+    status_code = response["status"]
+    if response["error"]:
+        status = "Fail"
+        error_message = f"Error: {response['error']}"
+    elif status_code == 404:
+        status = "Fail"
+        error_message = "404 Not Found"
+    else:
+        status = "pass"
+        error_message = ""
+
+    logging.info(f"Captured URL: {url}, Status: {status}, HTTP Code: {status_code}, Error: {error_message}")
+    return {
+        "URL": url,
+        "Status": status,
+        "HTTP Status Code": status_code if status_code else "N/A",
+        "Error Message": error_message if error_message else "None",
+        "Source": "Browser",
+        "Resource Type": response["type"],
+        "Load Time (ms)": response["time_ms"],
+    }
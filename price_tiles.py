@@ -0,0 +1,55 @@
+import re
+import functools
+
+from readiness import read_texts
+
+# Price tiles on listing pages
+PRICE_TILE_SELECTOR = ".js-price-value"
+
+# An amount such as "120", "1,234.50" or "1 234"
+AMOUNT_PATTERN = r"\d(?:[\d.,\s]*\d)?"
+
+# Tiles quoted in a failure reason, so huge pages keep short comments
+MAX_REPORTED_TILES = 5
+
+# Compiled matcher for a price in one currency: the symbol right before or after an amount
+@functools.lru_cache(maxsize=None)
+def price_pattern(symbol):
+    symbol = re.escape(symbol)
+    return re.compile(rf"{symbol}\s*(?P<before>{AMOUNT_PATTERN})|(?P<after>{AMOUNT_PATTERN})\s*{symbol}")
+
+# Amount of a tile priced in `symbol`, or None if the tile shows no such price
+def parse_price(text, symbol):
+    match = price_pattern(symbol).search(text or "")
+    if match is None:
+        return None
+    return match.group("before") or match.group("after")
+
+# Read every price tile in one round-trip
+def read_tiles(driver, selector=PRICE_TILE_SELECTOR):
+    return read_texts(driver, selector)
+
+# Tiles that do not show a price in `symbol`, as (1-based tile number, text) pairs
+def unconverted_tiles(texts, symbol):
+    return [(index + 1, text) for index, text in enumerate(texts) if parse_price(text, symbol) is None]
+
+# Check the tile texts against a currency; returns (status, reason) for the currency's row
+def verify_tiles(texts, symbol):
+    """
+    Verify that every price tile shows an amount in the given currency.
+
+    Args:
+        texts (list): Tile texts, e.g. from read_tiles.
+        symbol (str): Currency symbol the tiles should show.
+
+    Returns:
+        tuple: "Pass" or "Fail", and the reason, naming the tiles that did not convert.
+    """
+    if not texts:
+        return "Fail", "No price tiles found"
+    failed = unconverted_tiles(texts, symbol)
+    if not failed:
+        return "Pass", "Validation successful"
+    examples = ", ".join(f"#{number} '{text}'" for number, text in failed[:MAX_REPORTED_TILES])
+    more = f" and {len(failed) - MAX_REPORTED_TILES} more" if len(failed) > MAX_REPORTED_TILES else ""
+    return "Fail", f"Currency not reflected in {len(failed)} of {len(texts)} tiles: {examples}{more}"
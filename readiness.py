@@ -0,0 +1,206 @@
+import json
+import time
+import logging
+import weakref
+
+# Default time budget for getting one check's page ready, in seconds
+DEFAULT_BUDGET = 20
+
+# Default quiet period for "stopped changing" conditions, in seconds
+DEFAULT_QUIET = 0.5
+
+# Time allowed for lazily rendered elements (images, links) to stop appearing, in seconds
+DEFAULT_SETTLE_BUDGET = 5
+
+# Delay between condition polls, in seconds
+POLL_INTERVAL = 0.1
+
+# Every wait performed in this process: {"wait", "seconds", "ready"}
+WAIT_METRICS = []
+
+class WaitBudget:
+    """
+    Time budget shared by all the waits of one check.
+
+    Each wait may only use what is left of the budget, so a slow page
+    cannot make a single check wait longer than `seconds` in total.
+
+    Args:
+        seconds (float): Total time the check may spend waiting.
+    """
+
+    def __init__(self, seconds=DEFAULT_BUDGET):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+# Wait until a condition holds, within the budget, and record how long it took
+def wait_for(driver, condition, name, budget=None, poll=POLL_INTERVAL):
+    """
+    Poll `condition(driver)` until it is truthy or the budget runs out.
+
+    Args:
+        driver (webdriver): Selenium WebDriver instance.
+        condition (callable): Takes the driver and returns a truthy value when ready.
+        name (str): Name recorded in WAIT_METRICS and the log.
+        budget (WaitBudget): Budget to draw from; a fresh DEFAULT_BUDGET one if omitted.
+        poll (float): Delay between polls, in seconds.
+
+    Returns:
+        bool: True if the condition held, False if the wait timed out.
+    """
+    budget = budget or WaitBudget()
+    start = time.monotonic()
+    ready = False
+    while True:
+        try:
+            ready = bool(condition(driver))
+        except Exception as e:
+            logging.debug(f"Wait '{name}' condition raised: {e}")
+        if ready or budget.remaining() <= 0:
+            break
+        time.sleep(min(poll, budget.remaining()))
+
+    elapsed = time.monotonic() - start
+    WAIT_METRICS.append({"wait": name, "seconds": round(elapsed, 3), "ready": ready})
+    if ready:
+        logging.info(f"Wait '{name}' finished after {elapsed:.2f}s")
+    else:
+        logging.warning(f"Wait '{name}' timed out after {elapsed:.2f}s")
+    return ready
+
+# Condition: the document has finished loading
+def document_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+# Condition factory: a value read from the page has stopped changing for `quiet` seconds
+def _stable(read, quiet):
+    state = {"value": None, "since": None}
+
+    def condition(driver):
+        value = read(driver)
+        now = time.monotonic()
+        if state["since"] is None or value != state["value"]:
+            state["value"] = value
+            state["since"] = now
+            return False
+        return now - state["since"] >= quiet
+    return condition
+
+# Condition: the number of elements matching a CSS selector has stabilized
+def element_count_stable(selector, quiet=DEFAULT_QUIET):
+    return _stable(lambda driver: driver.execute_script("return document.querySelectorAll(arguments[0]).length", selector), quiet)
+
+# Wait until the elements matching a selector have stopped appearing, before a check reads them
+def wait_for_elements(driver, selector, name, budget=None):
+    return wait_for(driver, element_count_stable(selector), name, budget or WaitBudget(DEFAULT_SETTLE_BUDGET))
+
+# Condition: the page height has stabilized, e.g. after scrolling loads more content
+def page_height_stable(quiet=DEFAULT_QUIET):
+    return _stable(lambda driver: driver.execute_script("return document.body.scrollHeight"), quiet)
+
+# Read the texts of all elements matching a CSS selector in one round-trip
+def read_texts(driver, selector):
+    return driver.execute_script(
+        "return Array.from(document.querySelectorAll(arguments[0]), el => (el.innerText || '').trim())", selector
+    )
+
+# Condition: the texts of the matching elements differ from `before`, or all contain `expected`
+def text_changed(selector, before, expected=None):
+    def condition(driver):
+        texts = read_texts(driver, selector)
+        if not texts:
+            return False
+        if texts != before:
+            return True
+        return expected is not None and all(expected in text for text in texts)
+    return condition
+
+# Performance-log events read so far, per driver, so other consumers can reuse them
+_performance_events = weakref.WeakKeyDictionary()
+
+# Drain the Chrome performance log (CDP events) into the driver's event buffer
+def read_performance_events(driver):
+    events = _performance_events.setdefault(driver, [])
+    for entry in driver.get_log("performance"):
+        events.append(json.loads(entry["message"])["message"])
+    return events
+
+# Forget buffered performance events, e.g. before loading a new page. Events still
+# in Chrome's log belong to the previous page, so they are drained and discarded too.
+def reset_performance_events(driver):
+    _performance_events.pop(driver, None)
+    try:
+        driver.get_log("performance")
+    except Exception:
+        # No performance logging on this driver: nothing is buffered
+        pass
+
+# Count requests that have started but not finished, from CDP Network events
+def _in_flight_requests(events):
+    in_flight = set()
+    for event in events:
+        method = event.get("method")
+        request_id = event.get("params", {}).get("requestId")
+        if method == "Network.requestWillBeSent":
+            in_flight.add(request_id)
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            in_flight.discard(request_id)
+    return len(in_flight)
+
+# Condition: at most `max_in_flight` network requests in flight for `quiet` seconds.
+# The default tolerates two, so long-polling and analytics beacons don't block readiness.
+def network_idle(quiet=DEFAULT_QUIET, max_in_flight=2):
+    """
+    Network idle condition based on CDP Network events from the performance log.
+
+    Needs the driver to be started with performance logging (see
+    driver_pool.init_driver). Without it, falls back to the number of
+    Resource Timing entries staying stable.
+    """
+    quiet_since = {"value": None}
+    resources_stable = _stable(
+        lambda driver: driver.execute_script("return performance.getEntriesByType('resource').length"), quiet
+    )
+
+    def condition(driver):
+        try:
+            events = read_performance_events(driver)
+        except Exception:
+            return resources_stable(driver)
+        now = time.monotonic()
+        if _in_flight_requests(events) > max_in_flight:
+            quiet_since["value"] = None
+            return False
+        if quiet_since["value"] is None:
+            quiet_since["value"] = now
+        return now - quiet_since["value"] >= quiet
+    return condition
+
+# Wait until a freshly loaded page is ready: document loaded, then network idle
+def wait_for_page_ready(driver, budget=None):
+    budget = budget or WaitBudget()
+    ready = wait_for(driver, document_ready, "document ready", budget)
+    return wait_for(driver, network_idle(), "network idle", budget) and ready
+
+# Summarize the recorded waits per wait name
+def wait_metrics_summary():
+    summary = {}
+    for metric in WAIT_METRICS:
+        entry = summary.setdefault(metric["wait"], {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "timeouts": 0})
+        entry["count"] += 1
+        entry["total_seconds"] += metric["seconds"]
+        entry["max_seconds"] = max(entry["max_seconds"], metric["seconds"])
+        entry["timeouts"] += 0 if metric["ready"] else 1
+    return [
+        {
+            "Wait": name,
+            "Count": entry["count"],
+            "Average Seconds": round(entry["total_seconds"] / entry["count"], 3),
+            "Max Seconds": round(entry["max_seconds"], 3),
+            "Timeouts": entry["timeouts"],
+        }
+        for name, entry in summary.items()
+    ]
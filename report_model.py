@@ -1,104 +1,371 @@
 import os
-import subprocess
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, Border, Side, PatternFill
+import argparse
+import functools
+from excel_writer import open_workbook, write_sheet, measure_records, record_rows
+
+import Currency_Filtering_Test
+import H1_Tag_Existence_Test
+import HTML_Tag_Sequence_Test
+import Image_Alt_Attribute_Test
+import Scrape_Data_from_Script_Tag
+import URL_Status_Code_Test
+import static_engine
+import http_client
+from driver_pool import DriverPool, PageSession, init_driver, PROFILES, PROFILE_FULL
+from result_store import ResultStore, read_results, DEFAULT_STORE_DIR
+from link_index import open_index, reset_index, DEFAULT_INDEX_PATH
+from link_cache import open_cache, DEFAULT_CACHE_PATH
+from result_sink import JsonlSink, RowSink, emit_result, tail, collect_results, read_checkpoint, DEFAULT_SINK_PATH
+from readiness import wait_metrics_summary
+
+# Engines: "browser" runs every test in Chrome, "static" runs DOM-only tests on fetched HTML
+ENGINE_BROWSER = "browser"
+ENGINE_STATIC = "static"
 
 # Ensure directory exists
 def ensure_directory(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
-# Save DataFrame to Excel with auto-adjusted column widths and formatting
-def save_with_auto_width(filepath, df, sheet_name=None):
-    df.to_excel(filepath, index=False, engine='openpyxl', sheet_name=sheet_name)
-    wb = load_workbook(filepath)
-    ws = wb[sheet_name]
-
-    # Define styles
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill("solid", fgColor="4F81BD")
-    alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin")
-    )
-
-    # Adjust column widths and format headers
-    for col in ws.columns:
-        max_length = 0
-        col_letter = col[0].column_letter
-        for cell in col:
+# Adapters that call each test module's check function on an already loaded page
+# and return (detail rows, summary row). Checks that produce rows one by one
+# stream them to `sink` (a RowSink) as they go.
+def _run_currency_test(driver, url, sink=None, workers=1, profile=PROFILE_FULL):
+    driver_factory = functools.partial(init_driver, headless=True, profile=profile)
+    results = Currency_Filtering_Test.test_currency_filter(driver, url, load_page=False, sink=sink, workers=workers, driver_factory=driver_factory)
+    return results, Currency_Filtering_Test.build_currency_summary(url, results)
+
+def _run_h1_tag_test(driver, url, sink=None):
+    result, comment, h1_texts = H1_Tag_Existence_Test.check_all_h1_tags(driver, url, load_page=False)
+    return H1_Tag_Existence_Test.build_h1_report(url, result, comment, h1_texts)
+
+def _run_html_tag_test(driver, url, sink=None):
+    result, comment, header_info, levels = HTML_Tag_Sequence_Test.check_html_sequence(driver, url, load_page=False)
+    return HTML_Tag_Sequence_Test.build_html_sequence_report(url, result, comment, header_info, levels)
+
+def _run_image_alt_test(driver, url, sink=None):
+    return Image_Alt_Attribute_Test.check_image_alt_and_save(driver, url, load_page=False, sink=sink)
+
+def _run_script_data_test(driver, url, sink=None):
+    result, rows = Scrape_Data_from_Script_Tag.scrape_script_data(driver, url, load_page=False)
+    return Scrape_Data_from_Script_Tag.build_script_data_report(url, result, rows)
+
+def _run_url_status_test(driver, url, sink=None, capture_network=False, link_index=None, link_cache=DEFAULT_CACHE_PATH):
+    index = open_index(link_index) if link_index else None
+    cache = open_cache(link_cache) if link_cache else None
+    return URL_Status_Code_Test.check_url_status_and_save(driver, url, cache=cache, load_page=False, capture_network=capture_network, link_index=index)
+
+# Adapters that run the DOM-only checks on extracted page data
+# (from static_engine.fetch_page or dom_extract.extract_page_data)
+def _h1_tag_from_page_data(page, url, sink=None):
+    result, comment, h1_texts = H1_Tag_Existence_Test.evaluate_h1_texts(page["h1_texts"])
+    return H1_Tag_Existence_Test.build_h1_report(url, result, comment, h1_texts)
+
+def _html_tag_from_page_data(page, url, sink=None):
+    result, comment, header_info, levels = HTML_Tag_Sequence_Test.evaluate_heading_sequence(page["headings"])
+    return HTML_Tag_Sequence_Test.build_html_sequence_report(url, result, comment, header_info, levels)
+
+def _image_alt_from_page_data(page, url, sink=None):
+    return Image_Alt_Attribute_Test.report_image_alt(url, page["images"], sink=sink)
+
+def _script_data_from_page_data(page, url, sink=None):
+    result, rows = Scrape_Data_from_Script_Tag.evaluate_script_data(page["scripts"])
+    return Scrape_Data_from_Script_Tag.build_script_data_report(url, result, rows)
+
+# Tests driven by run_tests:
+# (report sheet name, test module, browser adapter, mutates the page, page-data adapter or None)
+TEST_SUITE = [
+    ("Currency Test", Currency_Filtering_Test, _run_currency_test, True, None),
+    ("H1 Tag", H1_Tag_Existence_Test, _run_h1_tag_test, False, _h1_tag_from_page_data),
+    ("Html Tag", HTML_Tag_Sequence_Test, _run_html_tag_test, False, _html_tag_from_page_data),
+    ("Image Alt", Image_Alt_Attribute_Test, _run_image_alt_test, False, _image_alt_from_page_data),
+    ("Script Data", Scrape_Data_from_Script_Tag, _run_script_data_test, False, _script_data_from_page_data),
+    ("Url Status", URL_Status_Code_Test, _run_url_status_test, False, None),
+]
+
+# Test suite with options for the link check: capture_network, link_index (path of a
+# run-wide LinkIndex shared by every page and worker of the run) and link_cache (path of
+# the LinkStatusCache kept across runs, None to check every link again)
+def with_link_options(test_suite, **options):
+    run_links = functools.partial(_run_url_status_test, **options)
+    return [
+        (name, module, run_links if run is _run_url_status_test else run, mutating, run_static)
+        for name, module, run, mutating, run_static in test_suite
+    ]
+
+# Test suite whose currency check validates currencies across `workers` browsers,
+# the extra ones started with the run's browser profile
+def with_currency_workers(test_suite, workers, profile=PROFILE_FULL):
+    run_currency = functools.partial(_run_currency_test, workers=workers, profile=profile)
+    return [
+        (name, module, run_currency if run is _run_currency_test else run, mutating, run_static)
+        for name, module, run, mutating, run_static in test_suite
+    ]
+
+# Run one check through its adapter, streaming its records to the sink if there is one
+def _run_adapter(run, target, url, name, sink):
+    row_sink = RowSink(sink, name, url) if sink is not None else None
+    try:
+        details, summary = run(target, url, row_sink)
+    except Exception as e:
+        print(f"Error running {name}: {e}")
+        details = []
+        summary = {"page_url": url, "testcase": name, "status": "Fail", "comments": f"Error: {e}"}
+    result = {"name": name, "details": details, "summary": summary}
+    if sink is not None:
+        emit_result(sink, result, row_sink.count)
+    return result
+
+# Run one test on a page session and return its structured result
+def run_test(session, name, run, mutating, sink=None):
+    print(f"Running test: {name}")
+
+    def run_on_session(session, url, row_sink):
+        driver = session.for_mutation() if mutating else session.for_read()
+        return run(driver, url, row_sink)
+    return _run_adapter(run_on_session, session, session.url, name, sink)
+
+# Run the static-capable tests on fetched HTML; returns None if the page needs a browser
+def run_static_tests(url, tests, js_pages=None, sink=None):
+    if js_pages is not None and js_pages.search(url):
+        return None
+    try:
+        page = static_engine.fetch_page(url)
+    except Exception as e:
+        print(f"Error fetching {url}, falling back to the browser: {e}")
+        return None
+    if static_engine.needs_javascript(page):
+        print(f"No server-rendered headings or images on {url}, falling back to the browser")
+        return None
+
+    return run_on_page_data(page, url, tests, sink)
+
+# Run tests through their static adapters on already extracted page data
+def run_on_page_data(page, url, tests, sink=None):
+    results = []
+    for name, _, _, _, run_static in tests:
+        print(f"Running test on extracted page data: {name}")
+        results.append(_run_adapter(run_static, page, url, name, sink))
+    return results
+
+# Run tests against one page, read-only ones first on a single page load
+def run_page_tests(pool, url, tests, engine=ENGINE_BROWSER, js_pages=None, sink=None):
+    """
+    Run tests against one page.
+
+    With the static engine, tests that have a static adapter run on the
+    page's server-rendered HTML, and Chrome is only used for the remaining
+    tests, for pages matching `js_pages`, and for pages that turn out to
+    be rendered client-side.
+
+    Args:
+        pool (DriverPool): Pool to borrow the driver from.
+        url (str): Page to check.
+        tests (list): TEST_SUITE entries.
+        engine (str): ENGINE_BROWSER or ENGINE_STATIC.
+        js_pages (re.Pattern): URLs that always need the browser.
+        sink (JsonlSink): Receives result records as the tests produce them; optional.
+
+    Returns:
+        list: Structured results in the same order as `tests`.
+    """
+    results = [None] * len(tests)
+    browser_indexes = list(range(len(tests)))
+
+    if engine == ENGINE_STATIC:
+        static_indexes = [index for index in browser_indexes if tests[index][4] is not None]
+        static_results = run_static_tests(url, [tests[index] for index in static_indexes], js_pages, sink) if static_indexes else None
+        if static_results is not None:
+            for index, result in zip(static_indexes, static_results):
+                results[index] = result
+            browser_indexes = [index for index in browser_indexes if index not in static_indexes]
+
+    if not browser_indexes:
+        return results
+
+    with PageSession(pool, url) as session:
+        # Read-only DOM checks share one batched extraction of the loaded page
+        snapshot_indexes = [index for index in browser_indexes if not tests[index][3] and tests[index][4] is not None]
+        if snapshot_indexes:
             try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-            cell.alignment = alignment
-            cell.border = border
-        ws.column_dimensions[col_letter].width = max_length + 5
-    for cell in ws[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = alignment
-
-    wb.save(filepath)
-
-# Run individual scripts and collect their outputs
-def run_tests(test_scripts, result_dir):
-    ensure_directory(result_dir)
-    for script in test_scripts:
-        script_name = os.path.basename(script)
-        print(f"Running test: {script_name}")
-        try:
-            subprocess.run(["python", script], check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Error running {script_name}: {e}")
+                page = session.snapshot()
+            except Exception as e:
+                print(f"Error extracting page data from {url}, running tests one by one: {e}")
+                page = None
+            if page is not None:
+                snapshot_results = run_on_page_data(page, url, [tests[index] for index in snapshot_indexes], sink)
+                for index, result in zip(snapshot_indexes, snapshot_results):
+                    results[index] = result
+                browser_indexes = [index for index in browser_indexes if index not in snapshot_indexes]
+
+        # Read-only tests first so they all see the same page load
+        for index in sorted(browser_indexes, key=lambda i: tests[i][3]):
+            name, _, run, mutating, _ = tests[index]
+            results[index] = run_test(session, name, run, mutating, sink)
+        print(f"Ran browser tests on {url} with {session.page_loads} page load(s)")
+    return results
+
+# Run all tests in this interpreter and collect their results
+def run_tests(test_suite=TEST_SUITE, pool=None, engine=ENGINE_BROWSER, sink=None):
+    """
+    Run every test in-process, loading each page once for all its read-only tests.
+
+    Tests are grouped by page URL. Read-only tests share one page load;
+    tests that mutate the page run afterwards, each on a page no earlier
+    test has changed (the first reuses the shared load, the rest reload it).
+
+    Args:
+        test_suite (list): TEST_SUITE entries; each module's DEFAULT_URL is checked.
+        pool (DriverPool): Pool to borrow drivers from; a single-driver pool is used if omitted.
+        engine (str): ENGINE_BROWSER or ENGINE_STATIC.
+        sink (JsonlSink): Receives result records as the tests produce them; optional.
+
+    Returns:
+        list: One dict per test, in test_suite order, with "name", "details"
+        (list of row dicts) and "summary" (row dict).
+    """
+    own_pool = pool is None
+    if own_pool:
+        pool = DriverPool(size=1)
+
+    pages = {}
+    for index, test in enumerate(test_suite):
+        pages.setdefault(test[1].DEFAULT_URL, []).append(index)
+
+    results = [None] * len(test_suite)
+    try:
+        for url, indexes in pages.items():
+            page_results = run_page_tests(pool, url, [test_suite[index] for index in indexes], engine, sink=sink)
+            for index, result in zip(indexes, page_results):
+                results[index] = result
+    finally:
+        if own_pool:
+            pool.close()
+    return results
 
 # Consolidate all test results into a single report
-def consolidate_results(result_dir, report_file):
-    summary_data = []
+def consolidate_results(results, report_file):
+    """
+    Write one sheet per test plus a summary sheet, in a single workbook pass.
+
+    Every sheet is streamed into one write-only workbook that is saved
+    once. Results are never collected: `results` is read once to find the
+    tests and measure the summary sheet, then twice per sheet (to measure
+    and to write it) and once more for the summary rows, so memory stays
+    bounded however long the run. Results of the same test from several
+    pages (e.g. a crawl) are merged into one sheet, with a page_url column
+    added to tell the pages apart.
+
+    Args:
+        results (callable): Returns a new iterable of structured results, as
+            from run_tests or crawl, on every call; called with a test name,
+            only that test's results (e.g. a partial of result_store.read_results).
+        report_file (str): Path of the report workbook.
+    """
+    pages = {}
+    def summaries(test_results):
+        for test_result in test_results:
+            pages[test_result["name"]] = pages.get(test_result["name"], 0) + 1
+            yield test_result["summary"]
+    summary_columns, summary_widths = measure_records(summaries(results()))
+
+    if not pages:
+        return
+
+    wb = open_workbook()
+    for name, count in pages.items():
+        # Add individual test results as a separate sheet
+        records = _sheet_records(results, name, count > 1)
+        columns, widths = measure_records(records())
+        write_sheet(wb, name, columns, record_rows(records(), columns), widths)
+
+    # Create the summary sheet
+    summary_rows = record_rows((test_result["summary"] for test_result in results()), summary_columns)
+    write_sheet(wb, "Summary", summary_columns, summary_rows, summary_widths)
 
-    for file_name in os.listdir(result_dir):
-        if file_name.endswith("_results.xlsx"):
-            file_path = os.path.join(result_dir, file_name)
-            test_case = file_name.replace("_results.xlsx", "").replace("_", " ").title()
+    wb.save(report_file)
+    print(f"Consolidated report saved to {report_file}")
 
-            # Load individual test results
-            df = pd.read_excel(file_path)
-            if 'testcase' not in df.columns:
-                df['testcase'] = test_case
-            summary_data.append(df[['page_url', 'testcase', 'result', 'comments']])
+# Detail records of one test across pages, as a re-iterable generator factory
+def _sheet_records(results, name, with_page_url):
+    def records():
+        for test_result in results(name):
+            if not with_page_url:
+                yield from test_result["details"]
+                continue
+            page_url = test_result["summary"]["page_url"]
+            for row in test_result["details"]:
+                yield dict({"page_url": page_url}, **row)
+    return records
 
-            # Add individual test results as a separate sheet
-            save_with_auto_width(report_file, df, sheet_name=test_case)
+# Structured results of a result stream, optionally of one test only; a source for consolidate_results
+def stream_results(sink_path, name=None):
+    return (result for result in collect_results(tail(sink_path)) if name is None or result["name"] == name)
 
-    # Create and save the summary sheet
-    if summary_data:
-        summary_df = pd.concat(summary_data, ignore_index=True)
-        save_with_auto_width(report_file, summary_df, sheet_name="Summary")
-        print(f"Consolidated report saved to {report_file}")
+# Render the report from a run's result stream, possibly while the run is still going
+def tail_report(sink_path, report_file, follow=False, idle_timeout=None):
+    # Follow the run first, announcing results as they finish; the report is then read from the stream as it stands
+    for result in collect_results(tail(sink_path, follow, idle_timeout)):
+        summary = result["summary"]
+        print(f"{result['name']} on {summary['page_url']}: {summary['status']}")
+    consolidate_results(functools.partial(stream_results, sink_path), report_file)
 
 # Main function
 def main():
-    test_scripts = [
-        "Currency_Filtering_Test.py",
-        "H1_Tag_Existence_Test.py",
-        "HTML_Tag_Sequence_Test.py",
-        "Image_Alt_Attribute_Test.py",
-        "Scrape_Data_from_Script_Tag.py",
-        "URL_Status_Code_Test.py",
-    ]
+    parser = argparse.ArgumentParser(description="Run all tests and build the consolidated report.")
+    parser.add_argument("--engine", choices=[ENGINE_BROWSER, ENGINE_STATIC], default=ENGINE_BROWSER, help="Run DOM-only tests on fetched HTML instead of in Chrome")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="Directory of the columnar result store")
+    parser.add_argument("--from-store", action="store_true", help="Only render the report from an existing result store")
+    parser.add_argument("--sink", default=DEFAULT_SINK_PATH, help="JSON Lines file results are streamed to while the tests run")
+    parser.add_argument("--tail", action="store_true", help="Only render the report from the result stream, including a run still in progress")
+    parser.add_argument("--follow", action="store_true", help="With --tail, keep reading new results until the run goes quiet or Ctrl-C")
+    parser.add_argument("--idle-timeout", type=float, default=60, help="With --follow, stop after this many seconds without new results")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run: skip tests its result stream shows as done, rerun the rest")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default=PROFILE_FULL, help="Browser profile; the audit profile blocks images, media, fonts and trackers")
+    parser.add_argument("--capture-network", action="store_true", help="Use the statuses the browser saw while loading the page and only probe links it did not load")
+    parser.add_argument("--no-cache", action="store_true", help="Check every link again instead of using the link status cache")
+    parser.add_argument("--http2", action="store_true", help="Fetch pages and check links over HTTP/2 (needs httpx[http2])")
+    parser.add_argument("--currency-workers", type=int, default=1, help="Number of browsers validating currencies at once")
+    args = parser.parse_args()
+    http_client.configure(http2=args.http2)
+
     result_dir = "test_results"
+    ensure_directory(result_dir)
     report_file = os.path.join(result_dir, "summary_report.xlsx")
 
-    # Run all tests
-    run_tests(test_scripts, result_dir)
+    if args.tail:
+        tail_report(args.sink, report_file, args.follow, args.idle_timeout)
+        return
+
+    # Run all tests; results are streamed to the sink as they are produced and the result
+    # store is the canonical output, from which the workbook is rendered
+    if not args.from_store:
+        with ResultStore(args.store) as store:
+            reset_index(DEFAULT_INDEX_PATH, keep_results=args.resume)
+            link_cache = None if args.no_cache else DEFAULT_CACHE_PATH
+            test_suite = with_link_options(TEST_SUITE, capture_network=args.capture_network, link_index=DEFAULT_INDEX_PATH, link_cache=link_cache)
+            test_suite = with_currency_workers(test_suite, args.currency_workers, args.profile)
+            if args.resume:
+                done, in_flight = read_checkpoint(args.sink)
+                test_suite = [test for test in test_suite if (test[0], test[1].DEFAULT_URL) not in done]
+                print(f"Resuming: {len(done)} test(s) already done, {in_flight} in flight will run again")
+            with JsonlSink(args.sink, resume=args.resume) as sink, DriverPool(size=1, factory=functools.partial(init_driver, profile=args.profile)) as pool:
+                run_tests(test_suite, pool, engine=args.engine, sink=sink)
+            # The store is filled from the result stream, which holds the rows checks streamed
+            # without keeping them, and on resume the earlier run's results as well
+            store.extend(collect_results(tail(args.sink)))
+            if link_cache:
+                open_cache(link_cache).close()
 
     # Consolidate results
-    consolidate_results(result_dir, report_file)
+    consolidate_results(functools.partial(read_results, args.store), report_file)
+
+    # Report how long the readiness waits actually took
+    for metric in wait_metrics_summary():
+        print(
+            f"Wait '{metric['Wait']}': {metric['Count']} time(s), average {metric['Average Seconds']}s, "
+            f"max {metric['Max Seconds']}s, {metric['Timeouts']} timeout(s)"
+        )
 
 if __name__ == "__main__":
     main()
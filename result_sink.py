@@ -0,0 +1,214 @@
+import os
+import json
+import time
+
+# Default location of the streamed results of a run
+DEFAULT_SINK_PATH = os.path.join("test_results", "results.jsonl")
+
+# How often the sink forces written records to disk, in seconds
+DEFAULT_FSYNC_INTERVAL = 1.0
+
+# Bytes read at a time when scanning a sink backwards for its last complete record
+SCAN_CHUNK_SIZE = 64 * 1024
+
+# Delay between reads when following a sink that is still being written, in seconds
+TAIL_POLL_INTERVAL = 0.5
+
+# Record kinds: a "started" record when a test begins, one "detail" record per
+# result row, then one "summary" record when the test finishes
+STARTED = "started"
+DETAIL = "detail"
+SUMMARY = "summary"
+
+# Status of a test whose summary has not been written yet
+INCOMPLETE = "Incomplete"
+
+class JsonlSink:
+    """
+    Append-only JSON Lines sink for result records.
+
+    Every record is written and flushed as soon as it is emitted, and the
+    file is fsync'ed at most every `fsync_interval` seconds, so a crash
+    loses at most that much and readers can follow the file while the
+    run is still going. The sink doubles as the run's checkpoint: tests
+    with a summary record are done, tests with only a "started" record
+    were in flight.
+
+    Args:
+        path (str): File to write; an existing file there is replaced.
+        fsync_interval (float): Minimum time between fsyncs, in seconds.
+        resume (bool): Append to an existing file instead, dropping a record
+            left half-written by a crash.
+    """
+
+    def __init__(self, path=DEFAULT_SINK_PATH, fsync_interval=DEFAULT_FSYNC_INTERVAL, resume=False):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        if resume and os.path.exists(path):
+            _drop_partial_record(path)
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+        self._last_fsync = time.monotonic()
+
+    def emit(self, record):
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# Truncate a sink file after its last complete record, reading it backwards from the end
+def _drop_partial_record(path):
+    with open(path, "rb+") as stream:
+        end = stream.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - SCAN_CHUNK_SIZE)
+            stream.seek(start)
+            newline = stream.read(end - start).rfind(b"\n")
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        stream.truncate(end)
+
+class RowSink:
+    """
+    Sink handed to a check so it can emit its detail rows as it produces them.
+
+    Args:
+        sink (JsonlSink): Sink the records go to.
+        name (str): Test name, as in TEST_SUITE.
+        page_url (str): Page the test runs on.
+    """
+
+    def __init__(self, sink, name, page_url):
+        self.sink = sink
+        self.name = name
+        self.page_url = page_url
+        self.count = 0
+        emit_started(sink, name, page_url)
+
+    def emit(self, row):
+        self.sink.emit({"kind": DETAIL, "name": self.name, "page_url": self.page_url, "row": row})
+        self.count += 1
+
+# Mark a test as in flight, so a resumed run knows to run it again
+def emit_started(sink, name, page_url):
+    sink.emit({"kind": STARTED, "name": name, "page_url": page_url})
+
+# Emit a finished structured result: the rows the check did not stream itself, then its summary
+def emit_result(sink, result, streamed=0):
+    page_url = result["summary"]["page_url"]
+    for row in result["details"][streamed:]:
+        sink.emit({"kind": DETAIL, "name": result["name"], "page_url": page_url, "row": row})
+    sink.emit({"kind": SUMMARY, "name": result["name"], "page_url": page_url, "summary": result["summary"]})
+
+# Read records from a sink, optionally following it as it grows
+def tail(path=DEFAULT_SINK_PATH, follow=False, idle_timeout=None, poll=TAIL_POLL_INTERVAL):
+    """
+    Yield the records of a JSON Lines sink.
+
+    A trailing line without a newline is still being written and is only
+    read once it is complete.
+
+    Args:
+        path (str): Sink file.
+        follow (bool): Keep waiting for new records at the end of the file,
+            until `idle_timeout` or Ctrl-C.
+        idle_timeout (float): When following, stop after this many seconds without new records.
+        poll (float): Delay between reads when following, in seconds.
+
+    Yields:
+        dict: Records in the order they were written.
+    """
+    with open(path, encoding="utf-8") as stream:
+        pending = ""
+        idle_since = time.monotonic()
+        while True:
+            line = stream.readline()
+            if line:
+                pending += line
+                if pending.endswith("\n"):
+                    record, pending = pending, ""
+                    idle_since = time.monotonic()
+                    if record.strip():
+                        yield json.loads(record)
+                continue
+            if not follow or (idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout):
+                return
+            try:
+                time.sleep(poll)
+            except KeyboardInterrupt:
+                return
+
+# Rebuild structured results from sink records; unfinished tests come last, marked incomplete
+def collect_results(records):
+    """
+    Group streamed records back into structured results.
+
+    Args:
+        records (iterable): Records from tail.
+
+    Yields:
+        dict: Structured results with "name", "details" and "summary", like
+        run_tests, in the order their tests finished. Tests still running
+        when the records end are yielded last with an INCOMPLETE status.
+        When a test was started again (a resumed run), only the rows of its
+        last attempt are kept.
+    """
+    open_results = {}
+    for record in records:
+        key = (record["name"], record["page_url"])
+        details = open_results.setdefault(key, [])
+        if record["kind"] == STARTED:
+            open_results[key] = []
+        elif record["kind"] == DETAIL:
+            details.append(record["row"])
+        elif record["kind"] == SUMMARY:
+            yield {"name": record["name"], "details": open_results.pop(key), "summary": record["summary"]}
+
+    for (name, page_url), details in open_results.items():
+        summary = {"page_url": page_url, "testcase": name, "status": INCOMPLETE, "comments": f"{len(details)} row(s) written before the run stopped"}
+        yield {"name": name, "details": details, "summary": summary}
+
+# Load the checkpoint of an interrupted run from its sink
+def read_checkpoint(path, store=None):
+    """
+    Find the (test name, page URL) pairs an earlier run already finished.
+
+    Args:
+        path (str): Sink of the earlier run; a missing file means nothing is done.
+        store (ResultStore): Receives the finished results, so the new run's
+            store and report include them; optional.
+
+    Returns:
+        tuple: The set of finished (name, page_url) pairs and the number of
+        tests that were in flight and will run again.
+    """
+    done = set()
+    in_flight = 0
+    if not os.path.exists(path):
+        return done, in_flight
+    for result in collect_results(tail(path)):
+        if result["summary"]["status"] == INCOMPLETE:
+            in_flight += 1
+            continue
+        done.add((result["name"], result["summary"]["page_url"]))
+        if store is not None:
+            store.append(result)
+    return done, in_flight
@@ -0,0 +1,204 @@
+import os
+import re
+import glob
+import shutil
+import logging
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Default location of the result store of a run
+DEFAULT_STORE_DIR = os.path.join("test_results", "results")
+
+# Results buffered in memory before they are written out as one part
+DEFAULT_BATCH_SIZE = 500
+
+# Fixed schema of the summary table: one row per (page, test) result
+SUMMARY_SCHEMA = pa.schema([
+    ("result_id", pa.int64()),
+    ("name", pa.string()),
+    ("page_url", pa.string()),
+    ("testcase", pa.string()),
+    ("status", pa.string()),
+    ("comments", pa.string()),
+])
+
+# Column of a detail table linking each row to its summary row
+RESULT_ID = "result_id"
+
+# Placeholder the checks show for a missing number; stored as null in numeric columns
+# marked with it, and shown again when the store is read
+MISSING = "N/A"
+
+# Schema of a detail table: RESULT_ID, then the given fields or (column, type) pairs
+def _detail_schema(columns):
+    return pa.schema([pa.field(RESULT_ID, pa.int64())] + [column if isinstance(column, pa.Field) else pa.field(*column) for column in columns])
+
+# Nullable status code whose missing value reads back as MISSING; the row's "Error Message" says why
+_STATUS_CODE = pa.field("HTTP Status Code", pa.int64(), metadata={"missing": MISSING})
+
+# Fixed schemas of the detail tables, by test name, so every part of a test has the same
+# column types and the parts of a test can be read as one Parquet dataset
+DETAIL_SCHEMAS = {
+    "Currency Test": _detail_schema([("Currency Name", pa.string()), ("Currency Symbol", pa.string()), ("Status", pa.string()), ("Reason", pa.string())]),
+    "H1 Tag": _detail_schema([("Page URL", pa.string()), ("Test Case", pa.string()), ("Result", pa.string()), ("Comments", pa.string()), ("Total H1 Tags Found", pa.int64())]),
+    "Html Tag": _detail_schema([("Tag", pa.string()), ("Text", pa.string())]),
+    "Image Alt": _detail_schema([("Image Index", pa.int64()), ("Image Source", pa.string()), ("Alt Text", pa.string()), ("Status", pa.string())]),
+    "Script Data": _detail_schema([("Field", pa.string()), ("Path", pa.string()), ("Value", pa.string()), ("Status", pa.string()), ("Reason", pa.string())]),
+    "Url Status": _detail_schema([
+        ("URL", pa.string()),
+        ("Status", pa.string()),
+        _STATUS_CODE,
+        ("Error Message", pa.string()),
+        ("Source", pa.string()),
+        ("Resource Type", pa.string()),
+        ("Load Time (ms)", pa.float64()),
+    ]),
+}
+
+# File name of a test's detail table inside a part directory
+def _details_file(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name) + ".parquet"
+
+# Schema of a test's detail table; tests without a declared one store every column as text
+def _schema_for(name, records):
+    if name in DETAIL_SCHEMAS:
+        return DETAIL_SCHEMAS[name]
+    columns = {}
+    for record in records:
+        columns.update(dict.fromkeys(record))
+    columns.pop(RESULT_ID, None)
+    return _detail_schema([(column, pa.string()) for column in columns])
+
+# A value converted to a column's type; values that are not numbers (e.g. MISSING) become null in numeric columns
+def _cell(value, type):
+    if value is None:
+        return None
+    if pa.types.is_integer(type):
+        return value if isinstance(value, int) and not isinstance(value, bool) else None
+    if pa.types.is_floating(type):
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    return str(value)
+
+# Build a detail table from dict records, with exactly the columns and types of `schema`
+def _records_table(records, schema):
+    unknown = {column for record in records for column in record} - set(schema.names)
+    if unknown:
+        logging.warning(f"Columns not in the detail schema are not stored: {sorted(unknown)}")
+    return pa.table({field.name: pa.array([_cell(record.get(field.name), field.type) for record in records], type=field.type) for field in schema}, schema=schema)
+
+# Show a stored row like the check produced it: nulls of MISSING-marked columns become MISSING
+# again, other nulls are columns the row did not have (e.g. no Source without network capture)
+def _restore_row(row, schema):
+    for field in schema:
+        if field.name not in row or row[field.name] is not None:
+            continue
+        if field.metadata and b"missing" in field.metadata:
+            row[field.name] = field.metadata[b"missing"].decode()
+        else:
+            del row[field.name]
+    return row
+
+class ResultStore:
+    """
+    Columnar store of structured test results, written as Parquet.
+
+    Results are buffered and written out every `batch_size` results as a
+    numbered part directory holding a summary table with SUMMARY_SCHEMA and
+    one detail table per test with its DETAIL_SCHEMAS schema, so a long crawl never keeps more than one
+    batch in memory. read_results turns the store back into structured
+    results for reporting.
+
+    Args:
+        path (str): Store directory; an existing store there is replaced.
+        batch_size (int): Results written per part.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_DIR, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = []
+        self._next_id = 0
+        self._parts = 0
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+    def append(self, result):
+        self._pending.append((self._next_id, result))
+        self._next_id += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    # Write the buffered results out as the next part
+    def flush(self):
+        if not self._pending:
+            return
+        self._parts += 1
+        part_dir = os.path.join(self.path, f"part-{self._parts:05d}")
+        os.makedirs(part_dir)
+
+        summaries = []
+        details = {}
+        for result_id, result in self._pending:
+            summary = result["summary"]
+            summaries.append({
+                "result_id": result_id,
+                "name": result["name"],
+                "page_url": summary.get("page_url"),
+                "testcase": summary.get("testcase"),
+                "status": summary.get("status"),
+                "comments": summary.get("comments"),
+            })
+            rows = details.setdefault(result["name"], [])
+            rows.extend(dict({RESULT_ID: result_id}, **row) for row in result["details"])
+
+        pq.write_table(pa.Table.from_pylist(summaries, schema=SUMMARY_SCHEMA), os.path.join(part_dir, "summary.parquet"))
+        for name, rows in details.items():
+            if rows:
+                pq.write_table(_records_table(rows, _schema_for(name, rows)), os.path.join(part_dir, _details_file(name)))
+        self._pending = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# Read a result store back as structured results, in the order they were stored
+def read_results(path=DEFAULT_STORE_DIR, name=None):
+    """
+    Read the structured results of a store written by ResultStore.
+
+    Parts are read one at a time, so memory is bounded by the batch size.
+
+    Args:
+        path (str): Store directory.
+        name (str): Only read the results of this test; all tests if omitted.
+
+    Yields:
+        dict: Structured results with "name", "details" and "summary", like run_tests.
+    """
+    for part_dir in sorted(glob.glob(os.path.join(path, "part-*"))):
+        filters = [("name", "=", name)] if name is not None else None
+        summaries = pq.read_table(os.path.join(part_dir, "summary.parquet"), filters=filters).to_pylist()
+
+        details = {}
+        for test_name in dict.fromkeys(summary["name"] for summary in summaries):
+            details_path = os.path.join(part_dir, _details_file(test_name))
+            if not os.path.exists(details_path):
+                continue
+            table = pq.read_table(details_path)
+            for row in table.to_pylist():
+                details.setdefault(row.pop(RESULT_ID), []).append(_restore_row(row, table.schema))
+
+        for summary in summaries:
+            result_id = summary.pop("result_id")
+            test_name = summary.pop("name")
+            yield {"name": test_name, "details": details.get(result_id, []), "summary": summary}
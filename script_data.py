@@ -0,0 +1,385 @@
+import re
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Type attribute of JSON-LD blocks, and of the script blocks that hold JavaScript
+JSON_LD_TYPE = "application/ld+json"
+JAVASCRIPT_TYPES = ("", "text/javascript", "application/javascript", "module")
+
+# Sources a field path can start with: global assignments, dataLayer pushes and JSON-LD blocks
+SOURCE_WINDOW = "window"
+SOURCE_DATALAYER = "dataLayer"
+SOURCE_JSONLD = "jsonld"
+
+# Statements whose value is extracted: `window.name = ...`, `var/let/const name = ...`
+# and `dataLayer.push(...)` (also through window)
+_STATEMENT = re.compile(
+    r"(?:\bwindow\.|(?<![\w$.])(?:var|let|const)\s+)(?P<name>[A-Za-z_$][\w$]*)\s*=(?!=)\s*"
+    r"|(?<![\w$.])(?:window\.)?dataLayer\.push\(\s*"
+)
+
+# JSON scalar at the start of a value
+_SCALAR = re.compile(r'"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b|true\b|false\b|null\b')
+
+# Comma between the arguments of a call
+_ARGUMENT_SEPARATOR = re.compile(r"\s*,\s*")
+
+# JSON string (an object key) and the whitespace between tokens
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+_WHITESPACE = re.compile(r"\s*")
+
+# What moves the nesting depth of a literal: string literals (skipped whole) and brackets
+_LITERAL_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|`(?:[^`\\]|\\.)*`|[{}\[\]]')
+
+# Parse JSON text, with orjson when it is installed
+def loads(text):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+# Index just past the object or array literal that starts at text[start]; -1 if it never closes.
+# With `depth`, text[start] is inside that many open brackets and the index is past the outermost one.
+def literal_end(text, start, depth=0):
+    for token in _LITERAL_TOKEN.finditer(text, start):
+        char = token.group()
+        if char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return token.end()
+    return -1
+
+# Parse the JSON value that starts at text[start]; returns (value, end), with end -1 if there is none
+def _value_at(text, start):
+    if text.startswith(("{", "["), start):
+        end = literal_end(text, start)
+    else:
+        match = _SCALAR.match(text, start)
+        end = match.end() if match else -1
+    if end == -1:
+        return None, -1
+    try:
+        return loads(text[start:end]), end
+    except ValueError:
+        # A JavaScript literal that is not JSON (unquoted keys, single quotes, expressions)
+        return None, -1
+
+# Index just past the JSON value that starts at text[start], without parsing it; -1 if there is none
+def _skip_value(text, start):
+    if text.startswith(("{", "["), start):
+        return literal_end(text, start)
+    match = _SCALAR.match(text, start)
+    return match.end() if match else -1
+
+# Requested global paths as a trie of keys, where None marks a complete path
+def _stream_plan(paths):
+    trie = {}
+    sources = set()
+    for path in paths:
+        source, *keys = path.split(".")
+        sources.add(source)
+        if source != SOURCE_WINDOW or not keys:
+            continue
+        node = trie
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+            if node is None:
+                # A shorter requested path already covers this one
+                break
+        else:
+            node[keys[-1]] = None
+    leaves = {name: _count_leaves(node) for name, node in trie.items() if node is not None}
+    # Scripts are read backwards only when every path is a global; "settled" then holds
+    # the globals whose last assignment was read
+    backwards = sources == {SOURCE_WINDOW}
+    return {"trie": trie, "leaves": leaves, "sources": sources, "backwards": backwards, "settled": set()}
+
+def _count_leaves(trie):
+    return sum(1 if node is None else _count_leaves(node) for node in trie.values())
+
+# Walk the JSON object or array at text[start] and copy only the values under `trie` into `target`
+def _pluck(text, start, trie, target, found, total, depth=1):
+    """
+    Incrementally parse one JSON container, building only requested values.
+
+    Everything outside the requested paths is skipped by scanning for its
+    end, never parsed, so memory stays flat however large the container is.
+    Once all `total` requested values are found the rest is only scanned
+    for the container's end.
+
+    Args:
+        text (str): Script text.
+        start (int): Index of the container's opening bracket.
+        trie (dict): Requested keys below this container; None marks a complete path.
+        target (dict): Receives the requested values; array items are keyed by index.
+        found (list): Requested values found so far in the outermost container; appended to.
+        total (int): Number of requested values in the outermost container.
+        depth (int): Nesting of this container in the outermost one, starting at 1.
+
+    Returns:
+        int: Index just past the outermost container once every requested value
+        is found, else just past this container.
+
+    Raises:
+        ValueError: The container is not valid JSON.
+    """
+    is_object = text[start] == "{"
+    closing = "}" if is_object else "]"
+    position = _WHITESPACE.match(text, start + 1).end()
+    if text.startswith(closing, position):
+        return position + 1
+    index = 0
+    while True:
+        if is_object:
+            key_match = _STRING.match(text, position)
+            if key_match is None:
+                raise ValueError(f"Expected a property name at index {position}")
+            key = loads(key_match.group())
+            position = _WHITESPACE.match(text, key_match.end()).end()
+            if not text.startswith(":", position):
+                raise ValueError(f"Expected ':' at index {position}")
+            position = _WHITESPACE.match(text, position + 1).end()
+        else:
+            key = str(index)
+            index += 1
+
+        if key not in trie:
+            end = _skip_value(text, position)
+        elif trie[key] is None:
+            target[key], end = _value_at(text, position)
+            if end != -1:
+                found.append(key)
+        elif text.startswith(("{", "["), position):
+            end = _pluck(text, position, trie[key], target.setdefault(key, {}), found, total, depth + 1)
+            if len(found) == total:
+                return end
+        else:
+            # A scalar where the requested paths expect a container: they do not exist
+            end = _skip_value(text, position)
+        if end == -1:
+            raise ValueError(f"Invalid JSON value at index {position}")
+        if len(found) == total:
+            # Everything requested is built; only the end of the outermost container is still needed
+            end = literal_end(text, end, depth)
+            if end == -1:
+                raise ValueError(f"Unclosed JSON value at index {start}")
+            return end
+
+        position = _WHITESPACE.match(text, end).end()
+        if text.startswith(",", position):
+            position = _WHITESPACE.match(text, position + 1).end()
+        elif text.startswith(closing, position):
+            return position + 1
+        else:
+            raise ValueError(f"Expected ',' or '{closing}' at index {position}")
+
+# Add the requested values of one global assignment; returns the index past its literal, -1 if unparsed.
+# Like a full extraction, a later assignment of the global replaces an earlier one.
+def _stream_global(sources, text, name, start, plan):
+    trie = plan["trie"]
+    if name not in trie:
+        return _skip_value(text, start)
+    if trie[name] is None or not text.startswith(("{", "["), start):
+        value, end = _value_at(text, start)
+        if end != -1:
+            sources[SOURCE_WINDOW][name] = value
+        return end
+    target = {}
+    try:
+        end = _pluck(text, start, trie[name], target, [], plan["leaves"][name])
+    except ValueError as e:
+        logging.debug(f"Skipping script global {name} that is not JSON: {e}")
+        return -1
+    sources[SOURCE_WINDOW][name] = target
+    return end
+
+# Add the JSON-LD objects of one block; @graph members count as blocks of their own
+def _add_json_ld(sources, text):
+    try:
+        data = loads(text)
+    except ValueError as e:
+        logging.warning(f"Skipping invalid JSON-LD block: {e}")
+        return
+    for item in data if isinstance(data, list) else [data]:
+        if isinstance(item, dict):
+            sources[SOURCE_JSONLD].append(item)
+            sources[SOURCE_JSONLD].extend(node for node in item.get("@graph", []) if isinstance(node, dict))
+
+# Add the global assignments and dataLayer pushes of one inline script
+def _add_javascript(sources, text, plan=None):
+    position = 0
+    assigned = set()
+    while True:
+        statement = _STATEMENT.search(text, position)
+        if statement is None:
+            if plan is not None and plan["backwards"]:
+                plan["settled"].update(assigned)
+            return
+        name = statement.group("name")
+        if plan is not None and name not in (None, SOURCE_DATALAYER):
+            if name in plan["settled"]:
+                # A later script assigns it again and was read first (see extract_sources)
+                end = _skip_value(text, statement.end())
+            else:
+                end = _stream_global(sources, text, name, statement.end(), plan)
+                if end != -1:
+                    assigned.add(name)
+            position = end if end != -1 else statement.end()
+            continue
+        if plan is not None and SOURCE_DATALAYER not in plan["sources"]:
+            end = _skip_value(text, statement.end())
+            position = end if end != -1 else statement.end()
+            continue
+        value, end = _value_at(text, statement.end())
+        if end == -1:
+            position = statement.end()
+            continue
+        if name is None:
+            # dataLayer.push(a, b, ...) pushes every argument
+            sources[SOURCE_DATALAYER].append(value)
+            while True:
+                comma = _ARGUMENT_SEPARATOR.match(text, end)
+                if comma is None:
+                    break
+                value, next_end = _value_at(text, comma.end())
+                if next_end == -1:
+                    break
+                sources[SOURCE_DATALAYER].append(value)
+                end = next_end
+        elif name == SOURCE_DATALAYER and isinstance(value, list):
+            sources[SOURCE_DATALAYER].extend(value)
+        else:
+            sources[SOURCE_WINDOW][name] = value
+        # The literal was parsed whole, so nothing inside it needs scanning
+        position = end
+
+# Collect the structured data of a page's script blocks
+def extract_sources(scripts, paths=None):
+    """
+    Pull the data out of a page's <script> blocks in one pass.
+
+    Inline scripts are scanned for JSON values assigned to globals and
+    pushed to the dataLayer; only the literal is parsed, never the rest of
+    the script. Values that are JavaScript but not JSON are skipped.
+
+    With `paths`, extraction is incremental: globals are walked without
+    being materialized, only the values under the requested paths are
+    built, and a global's literal is only scanned for its end once all of
+    its requested values are found. Sources no path starts with are
+    skipped, so large listing payloads cost a scan, not an object graph.
+    When every path is a global, scripts are read last to first and the
+    earlier ones are skipped once each requested global was assigned, as
+    the last assignment wins. Either way the requested paths resolve as
+    after a full extraction.
+
+    Args:
+        scripts (list): (type attribute, text) pairs, one per <script> block,
+            from static_engine.parse_html or dom_extract.extract_page_data.
+        paths (list): Field paths that will be resolved, as in resolve; optional.
+
+    Returns:
+        dict: SOURCE_WINDOW maps global names to values, SOURCE_DATALAYER
+        lists pushed values in order and SOURCE_JSONLD lists JSON-LD objects.
+        With `paths`, globals only hold the requested parts of their values.
+    """
+    plan = _stream_plan(paths) if paths is not None else None
+    sources = {SOURCE_WINDOW: {}, SOURCE_DATALAYER: [], SOURCE_JSONLD: []}
+    # Only globals requested: the last assignment of each is the one that counts, so read backwards
+    backwards = plan is not None and plan["backwards"]
+    for script_type, text in reversed(scripts) if backwards else scripts:
+        if backwards and plan["settled"] >= set(plan["trie"]):
+            logging.info(f"All {len(plan['trie'])} requested script globals found, skipping the earlier scripts")
+            break
+        if not text:
+            continue
+        script_type = (script_type or "").strip().lower()
+        if script_type == JSON_LD_TYPE:
+            if plan is None or SOURCE_JSONLD in plan["sources"]:
+                _add_json_ld(sources, text)
+        elif script_type in JAVASCRIPT_TYPES:
+            _add_javascript(sources, text, plan)
+    logging.info(
+        f"Found {len(sources[SOURCE_WINDOW])} script globals, {len(sources[SOURCE_DATALAYER])} dataLayer pushes "
+        f"and {len(sources[SOURCE_JSONLD])} JSON-LD objects in {len(scripts)} scripts"
+    )
+    return sources
+
+# Follow dotted keys into a value; digits index lists. Returns (found, value)
+def _lookup(value, keys):
+    for key in keys:
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return False, None
+    return True, value
+
+# Value at a field path such as "window.ScriptData.config.SiteUrl"; returns (found, value)
+def resolve(sources, path):
+    """
+    Look a field path up in the extracted sources.
+
+    The first key names the source. dataLayer pushes are searched latest
+    first, like the Tag Manager data model; JSON-LD objects in page order.
+
+    Args:
+        sources (dict): From extract_sources.
+        path (str): Source name and dotted keys.
+
+    Returns:
+        tuple: Whether the path exists, and its value.
+    """
+    source, *keys = path.split(".")
+    if source == SOURCE_WINDOW:
+        roots = [sources[SOURCE_WINDOW]]
+    elif source == SOURCE_DATALAYER:
+        roots = reversed(sources[SOURCE_DATALAYER])
+    elif source == SOURCE_JSONLD:
+        roots = sources[SOURCE_JSONLD]
+    else:
+        raise ValueError(f"Unknown script data source {source!r} in {path!r}")
+    for root in roots:
+        found, value = _lookup(root, keys)
+        if found:
+            return True, value
+    return False, None
+
+# Text of a value as shown in the report; objects and lists as compact JSON
+def display_value(value):
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+# Check the extracted sources against a declarative field spec
+def match_fields(sources, fields):
+    """
+    Resolve and validate every field of a spec.
+
+    Args:
+        sources (dict): From extract_sources.
+        fields (dict): Maps a field name to a (path, pattern) pair. The value's
+            text must match the regular expression `pattern` (re.search), or
+            only has to exist when the pattern is None.
+
+    Returns:
+        list: One row per field with "Field", "Path", "Value", "Status" and "Reason".
+    """
+    rows = []
+    for field, (path, pattern) in fields.items():
+        found, value = resolve(sources, path)
+        if not found:
+            rows.append({"Field": field, "Path": path, "Value": "N/A", "Status": "Fail", "Reason": "Not found in the page's scripts"})
+            continue
+        text = display_value(value)
+        if pattern is not None and not re.search(pattern, text):
+            rows.append({"Field": field, "Path": path, "Value": text, "Status": "Fail", "Reason": f"Does not match {pattern}"})
+        else:
+            rows.append({"Field": field, "Path": path, "Value": text, "Status": "Pass", "Reason": "None"})
+    return rows
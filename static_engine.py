@@ -0,0 +1,118 @@
+import logging
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from http_client import get_session
+
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+# Timeout for fetching a page's HTML, in seconds
+DEFAULT_FETCH_TIMEOUT = 15
+
+class PageParser(HTMLParser):
+    """
+    Single-pass collector of the markup the DOM-only checks look at.
+
+    After feeding a document, `headings` holds (tag name, text) pairs in
+    document order, `images` holds (src, alt) pairs and `links` holds
+    anchor hrefs, with URLs resolved against the page URL like the
+    browser's `img.src` and `a.href` properties. `scripts` holds
+    (type attribute, text) pairs of the <script> blocks.
+    """
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.headings = []
+        self.images = []
+        self.links = []
+        self.scripts = []
+        self._open_headings = []
+        self._script = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HEADING_TAGS:
+            # Record the heading when it opens so nested or unclosed headings keep document order
+            parts = []
+            self.headings.append((tag, parts))
+            self._open_headings.append((tag, parts))
+        elif tag == "img":
+            attrs = dict(attrs)
+            src = attrs.get("src")
+            self.images.append((urljoin(self.base_url, src) if src else src, attrs.get("alt")))
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(urljoin(self.base_url, href))
+        elif tag == "script":
+            self._script = []
+            self.scripts.append((dict(attrs).get("type"), self._script))
+        elif tag == "base":
+            href = dict(attrs).get("href")
+            if href:
+                self.base_url = urljoin(self.base_url, href)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == "script":
+            self._script = None
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._script = None
+        if tag not in HEADING_TAGS:
+            return
+        # Close the innermost matching heading, tolerating unclosed ones inside it
+        for index in range(len(self._open_headings) - 1, -1, -1):
+            if self._open_headings[index][0] == tag:
+                del self._open_headings[index:]
+                return
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+            return
+        for _, parts in self._open_headings:
+            parts.append(data)
+
+    def close(self):
+        super().close()
+        # Headings are recorded in document order with whitespace collapsed, like element.text
+        self.headings = [(tag, " ".join("".join(parts).split())) for tag, parts in self.headings]
+        self.scripts = [(script_type, "".join(parts)) for script_type, parts in self.scripts]
+
+# Parse a page's HTML into the data used by the DOM-only checks
+def parse_html(html, base_url):
+    """
+    Parse server-rendered HTML without a browser.
+
+    Args:
+        html (str): Page markup.
+        base_url (str): URL the markup was fetched from, used to resolve image sources.
+
+    Returns:
+        dict: "headings" as (tag name, text) pairs, "h1_texts", "images" as (src, alt) pairs,
+        "links" and "scripts" as (type, text) pairs; the same shape as dom_extract.extract_page_data.
+    """
+    parser = PageParser(base_url)
+    parser.feed(html)
+    parser.close()
+    return {
+        "headings": parser.headings,
+        "h1_texts": [text for tag, text in parser.headings if tag == "h1"],
+        "images": parser.images,
+        "links": parser.links,
+        "scripts": parser.scripts,
+    }
+
+# Fetch a page over the shared HTTP client and parse it
+def fetch_page(url, session=None, timeout=DEFAULT_FETCH_TIMEOUT):
+    session = session or get_session()
+    response = session.get(url, timeout=timeout, verify=False)
+    response.raise_for_status()
+    logging.info(f"Fetched {len(response.content)} bytes of HTML from {url}")
+    return parse_html(response.text, response.url)
+
+# Guess whether a page is rendered client-side and needs a real browser
+def needs_javascript(page):
+    return not page["headings"] and not page["images"]
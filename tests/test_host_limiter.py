@@ -0,0 +1,102 @@
+import time
+import threading
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from host_limiter import HostLimiter, parse_retry_after, DEFAULT_RETRY_AFTER, MAX_RETRY_AFTER, MAX_HOST_RATE, LATENCY_SAMPLES
+
+HOST = "example.com"
+
+# Retry-After values and the pause they give, in seconds
+RETRY_AFTER_VALUES = [
+    ("5", 5.0),
+    ("0.5", 0.5),
+    ("-3", 0.0),
+    ("3600", MAX_RETRY_AFTER),
+    ("", DEFAULT_RETRY_AFTER),
+    (None, DEFAULT_RETRY_AFTER),
+    ("soon", DEFAULT_RETRY_AFTER),
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+]
+
+@pytest.mark.parametrize("value, seconds", RETRY_AFTER_VALUES)
+def test_retry_after_is_parsed_and_bounded(value, seconds):
+    assert parse_retry_after(value) == seconds
+
+def test_retry_after_as_http_date():
+    value = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 28 <= parse_retry_after(value) <= 30
+
+def test_throttling_halves_concurrency_and_rate_and_pauses_the_host():
+    limiter = HostLimiter(8, rate=10.0)
+    limiter.record(HOST, 429, 0.1, "5")
+    state = limiter._hosts[HOST]
+    assert (state.concurrency, state.rate) == (4.0, 5.0)
+    assert 4 < state.paused_until - time.monotonic() <= 5
+
+    limiter.record(HOST, None, 5.0)
+    assert (state.concurrency, state.rate) == (2.0, 2.5)
+
+def test_limits_never_drop_below_one_request():
+    limiter = HostLimiter(4, rate=1.0)
+    for _ in range(10):
+        limiter.record(HOST, 503, 0.1, "0")
+    state = limiter._hosts[HOST]
+    assert (state.concurrency, state.rate) == (1.0, 0.5)
+
+def test_successes_recover_the_limits_additively_up_to_their_caps():
+    limiter = HostLimiter(4, rate=10.0)
+    limiter.record(HOST, 429, 0.1, "0")
+    state = limiter._hosts[HOST]
+    limiter.record(HOST, 200, 0.1)
+    assert 2.0 < state.concurrency < 3.0 and 5.0 < state.rate < 6.0
+
+    for _ in range(5000):
+        limiter.record(HOST, 200, 0.1)
+    assert (state.concurrency, state.rate) == (4, MAX_HOST_RATE)
+
+def test_latency_spike_halves_concurrency_only():
+    limiter = HostLimiter(4, rate=10.0)
+    for _ in range(LATENCY_SAMPLES):
+        limiter.record(HOST, 200, 0.1)
+    state = limiter._hosts[HOST]
+    rate = state.rate
+    limiter.record(HOST, 200, 1.0)
+    assert (state.concurrency, state.rate) == (2.0, rate)
+
+def test_hosts_are_limited_independently():
+    limiter = HostLimiter(4)
+    limiter.record(HOST, 429, 0.1, "0")
+    limiter.record("other.example", 200, 0.1)
+    assert limiter._hosts["other.example"].concurrency == 4
+
+def test_slot_waits_out_the_pause():
+    limiter = HostLimiter(4, rate=1000.0)
+    limiter.record(HOST, 429, 0.1, "0.2")
+    start = time.monotonic()
+    with limiter.slot(HOST):
+        assert time.monotonic() - start >= 0.19
+
+def test_slots_never_exceed_the_concurrency_limit():
+    limiter = HostLimiter(2, rate=1000.0)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def request():
+        with limiter.slot(HOST):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(peak) == 6 and max(peak) == 2
@@ -0,0 +1,57 @@
+import json
+
+import URL_Status_Code_Test
+from driver_pool import open_page
+from network_capture import page_responses
+
+# CDP events of one request, as Chrome's performance log entries
+def _log_entries(url, status, request_id):
+    events = [
+        {"method": "Network.requestWillBeSent", "params": {"requestId": request_id, "type": "Document", "timestamp": 1.0, "request": {"url": url}}},
+        {"method": "Network.responseReceived", "params": {"requestId": request_id, "response": {"status": status}}},
+        {"method": "Network.loadingFinished", "params": {"requestId": request_id, "timestamp": 1.2}},
+    ]
+    return [{"message": json.dumps({"message": event})} for event in events]
+
+class FakeDriver:
+    """Pooled driver whose performance log still holds the previous page's events."""
+
+    def __init__(self, leftover):
+        self.log = list(leftover)
+        self.pages = {}
+
+    def get_log(self, kind):
+        entries, self.log = self.log, []
+        return entries
+
+    def get(self, url):
+        self.log.extend(self.pages[url])
+
+    def execute_script(self, script, *args):
+        return "complete" if "readyState" in script else 0
+
+def test_open_page_drops_events_left_from_the_previous_page(monkeypatch):
+    monkeypatch.setattr("driver_pool.wait_for_page_ready", lambda driver, budget: True)
+    driver = FakeDriver(_log_entries("https://previous.example/missing", 404, "1"))
+    driver.pages["https://next.example/"] = _log_entries("https://next.example/", 200, "2")
+
+    open_page(driver, "https://next.example/")
+
+    responses = page_responses(driver)
+    assert list(responses) == ["https://next.example/"]
+    assert responses["https://next.example/"]["status"] == 200
+
+def test_anchors_match_loaded_urls_by_normalized_form(monkeypatch):
+    probed = []
+    monkeypatch.setattr(URL_Status_Code_Test, "_probe_links", lambda links, *args: probed.extend(links) or [{"URL": link} for link in links])
+    driver = FakeDriver(_log_entries("https://site.example/page?b=2&a=1", 200, "1") + _log_entries("https://cdn.example/app.js", 200, "2"))
+    links = ["https://site.example/page/?a=1&b=2#reviews", "https://site.example/other"]
+
+    rows = URL_Status_Code_Test._check_with_network_capture(driver, links, 1, 1, None, None)
+
+    assert probed == ["https://site.example/other"]
+    assert [(row["URL"], row["Source"]) for row in rows] == [
+        ("https://site.example/page/?a=1&b=2#reviews", "Browser"),
+        ("https://site.example/other", "Probe"),
+        ("https://cdn.example/app.js", "Browser"),
+    ]
@@ -0,0 +1,44 @@
+import pytest
+
+from price_tiles import price_pattern, parse_price, unconverted_tiles, verify_tiles, MAX_REPORTED_TILES
+
+# Tile texts, the currency symbol checked and the amount found (None: no price in that currency)
+TILE_PRICES = [
+    ("€ 120", "€", "120"),
+    ("120€", "€", "120"),
+    ("1,234.50 $", "$", "1,234.50"),
+    ("1.234,50 kr", "kr", "1.234,50"),
+    ("US$ 1 234", "US$", "1 234"),
+    ("From $5 / night", "$", "5"),
+    ("120", "€", None),
+    ("€", "€", None),
+    ("£120", "€", None),
+    ("", "€", None),
+    (None, "€", None),
+]
+
+@pytest.mark.parametrize("text, symbol, amount", TILE_PRICES)
+def test_price_is_found_on_either_side_of_the_symbol(text, symbol, amount):
+    assert parse_price(text, symbol) == amount
+
+def test_symbols_are_matched_literally_and_compiled_once():
+    assert price_pattern("$") is price_pattern("$")
+    assert price_pattern("$").search("US 120") is None
+    assert price_pattern("(€)").search("€120") is None
+
+def test_unconverted_tiles_are_numbered_from_one():
+    assert unconverted_tiles(["€1", "$2", "€3", "4"], "€") == [(2, "$2"), (4, "4")]
+
+def test_every_converted_tile_passes():
+    assert verify_tiles(["€ 10", "20 €"], "€") == ("Pass", "Validation successful")
+
+def test_no_tiles_fail():
+    assert verify_tiles([], "€") == ("Fail", "No price tiles found")
+
+def test_failure_quotes_a_few_unconverted_tiles():
+    texts = [f"${number}" for number in range(MAX_REPORTED_TILES + 3)] + ["€1"]
+    status, reason = verify_tiles(texts, "€")
+    assert status == "Fail"
+    assert reason.startswith(f"Currency not reflected in {MAX_REPORTED_TILES + 3} of {len(texts)} tiles: #1 '$0', #2 '$1'")
+    assert reason.endswith(" and 3 more")
+    assert reason.count("#") == MAX_REPORTED_TILES
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from script_data import extract_sources, resolve
+
+# Page scripts mixing every source, with globals assigned more than once
+MIXED_SCRIPTS = [
+    ("application/ld+json", json.dumps({"@type": "Organization", "name": "Aloj", "@graph": [{"@type": "Place", "geo": {"lat": 40.4}}]})),
+    (None, 'window.dataLayer = window.dataLayer || []; dataLayer.push({"event": "first", "pageType": "list"});'),
+    (None, 'var ScriptData = {"config": {"SiteUrl": "https://old", "CampaignId": "OLD"}, "list": [{"id": 1}]}; var flag = 1;'),
+    (None, 'window.ScriptData = {"config": {"SiteUrl": "https://new"}, "list": [{"id": 2}, {"id": 3}], "rest": ' + json.dumps(list(range(50))) + '};'),
+    (None, 'dataLayer.push({"event": "e"}, {"step": 2}); var flag = 2; var bad = {a: 1}; var bad = {"a": 3};'),
+    (None, 'var late = {"x": {"y": "z"}}; window.flag = "3";'),
+]
+
+PATH_SETS = [
+    # Globals only, some reassigned in later scripts
+    ["window.ScriptData.config.SiteUrl", "window.ScriptData.config.CampaignId", "window.ScriptData.list.1.id", "window.flag"],
+    # Globals mixed with dataLayer and JSON-LD paths
+    ["window.ScriptData.config.SiteUrl", "dataLayer.event", "dataLayer.pageType", "dataLayer.step", "jsonld.name", "jsonld.geo.lat"],
+    # Whole globals, paths into scalars, missing and non-JSON globals
+    ["window.late", "window.late.x.y", "window.flag.length", "window.missing.key", "window.bad.a"],
+]
+
+@pytest.mark.parametrize("paths", PATH_SETS)
+def test_incremental_extraction_resolves_like_full_extraction(paths):
+    full = extract_sources(MIXED_SCRIPTS)
+    incremental = extract_sources(MIXED_SCRIPTS, paths=paths)
+    assert [resolve(incremental, path) for path in paths] == [resolve(full, path) for path in paths]
+
+def test_later_assignment_of_a_global_wins():
+    paths = ["window.ScriptData.config.SiteUrl", "window.ScriptData.config.CampaignId", "window.flag"]
+    for sources in (extract_sources(MIXED_SCRIPTS), extract_sources(MIXED_SCRIPTS, paths=paths)):
+        assert resolve(sources, "window.ScriptData.config.SiteUrl") == (True, "https://new")
+        assert resolve(sources, "window.ScriptData.config.CampaignId") == (False, None)
+        assert resolve(sources, "window.flag") == (True, "3")
+
+def test_dataLayer_pushes_after_found_globals_are_kept():
+    sources = extract_sources(MIXED_SCRIPTS, paths=["window.ScriptData.config.SiteUrl", "dataLayer.event"])
+    assert resolve(sources, "dataLayer.event") == (True, "e")
+
+def test_incremental_extraction_stops_building_at_requested_values():
+    blob = "var ScriptData = " + json.dumps({"config": {"SiteUrl": "https://a"}, "props": [{"id": i} for i in range(1000)]}) + "; var after = 1;"
+    sources = extract_sources([(None, blob)], paths=["window.ScriptData.config.SiteUrl", "window.after"])
+    assert sources["window"] == {"ScriptData": {"config": {"SiteUrl": "https://a"}}, "after": 1}
@@ -0,0 +1,42 @@
+import pytest
+
+from url_normalize import normalize, is_tracking_param
+
+# Variants of one link and the canonical form they all normalize to
+EQUIVALENT_URLS = [
+    (["https://example.com/a?b=2&a=1", "HTTPS://Example.COM:443/a/?a=1&b=2#reviews", "https://example.com/a?a=1&utm_source=x&b=2&gclid=1"], "https://example.com/a?a=1&b=2"),
+    (["http://example.com", "http://example.com:80/", "http://EXAMPLE.com/#top", "http://example.com/?"], "http://example.com/"),
+    (["http://[::1]:80/a/", "http://[::1]/a"], "http://[::1]/a"),
+    (["https://User:Pw@Example.com:443/p/", "https://User:Pw@example.com/p"], "https://User:Pw@example.com/p"),
+    (["  https://example.com/p  ", "https://example.com/p//"], "https://example.com/p"),
+]
+
+@pytest.mark.parametrize("urls, canonical", EQUIVALENT_URLS)
+def test_variants_of_a_link_normalize_to_one_url(urls, canonical):
+    assert [normalize(url) for url in urls] == [canonical] * len(urls)
+
+# Links that must stay apart, with what normalization keeps of each
+DISTINCT_URLS = [
+    ("http://example.com:8080/", "http://example.com:8080/"),
+    ("https://example.com:8443/p/", "https://example.com:8443/p"),
+    ("http://[2001:DB8::1]:8080/x", "http://[2001:db8::1]:8080/x"),
+    ("https://user@example.com/", "https://user@example.com/"),
+    ("https://example.com:99999/p", "https://example.com:99999/p"),
+    ("https://example.com/P?ID=3", "https://example.com/P?ID=3"),
+    ("https://example.com/p?a=&b", "https://example.com/p?a=&b="),
+]
+
+@pytest.mark.parametrize("url, normalized", DISTINCT_URLS)
+def test_ports_userinfo_and_path_case_are_kept(url, normalized):
+    assert normalize(url) == normalized
+
+def test_http_and_https_stay_distinct():
+    assert normalize("http://example.com/") != normalize("https://example.com/")
+
+@pytest.mark.parametrize("name", ["utm_source", "UTM_Medium", "gclid", "fbclid", "_ga", "mc_eid"])
+def test_tracking_params_are_recognized(name):
+    assert is_tracking_param(name)
+
+@pytest.mark.parametrize("name", ["id", "page", "utm", "currency"])
+def test_other_params_are_kept(name):
+    assert not is_tracking_param(name)
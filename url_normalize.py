@@ -0,0 +1,52 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {"gclid", "dclid", "fbclid", "msclkid", "yclid", "mc_cid", "mc_eid", "_ga", "_gl", "igshid"}
+TRACKING_PREFIXES = ("utm_",)
+
+# Ports implied by the scheme
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Whether a query parameter only tracks the visitor
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+# Canonical form of a URL, so variants of the same link are checked once
+def normalize(url):
+    """
+    Normalize a URL for deduplication.
+
+    Lowercases the scheme and host, drops the default port, the fragment,
+    tracking parameters and a trailing slash (except for the root path),
+    and sorts the remaining query parameters.
+
+    Args:
+        url (str): Absolute URL.
+
+    Returns:
+        str: The canonical URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        # Not a valid port; keep the authority as written
+        host, port = parts.netloc.rsplit("@", 1)[-1].lower(), None
+    else:
+        host = (parts.hostname or "").lower()
+        if ":" in host:
+            host = f"[{host}]"
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username or parts.password:
+        host = f"{parts.netloc.rsplit('@', 1)[0]}@{host}"
+
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+
+    params = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if not is_tracking_param(name)]
+    query = urlencode(sorted(params))
+    return urlunsplit((scheme, host, path, query, ""))